@@ -1,20 +1,29 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING, Iterable, Literal, Sequence
+import struct
+from hashlib import sha1
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Literal, Sequence
 
 import numpy as np
 import pyrocko.orthodrome as od
-from lru import LRU
 from pydantic import BaseModel, ByteSize, Field, PositiveFloat, PrivateAttr
 
+from qseek.ext import array_tools
+from qseek.models.station import Stations
 from qseek.octree import get_node_coordinates
+from qseek.utils import CACHE_DIR
 
 if TYPE_CHECKING:
-    from qseek.models.station import Station, Stations
+    from qseek.models.station import Station
     from qseek.octree import Node, Octree
 
 MB = 1024**2
+# Single precision, far-field weights are float16 subnormals and underflow to 0
+LUT_DTYPE = np.float32
+# Elements per block, the in-place weight passes then stay within the CPU cache
+WEIGHTS_BLOCK_SIZE = 2**16
 
 logger = logging.getLogger(__name__)
 
@@ -38,32 +47,127 @@ class DistanceWeights(BaseModel):
     )
     lut_cache_size: ByteSize = Field(
         default=200 * MB,
-        description="Size of the LRU cache in bytes. Default is 200 MB.",
+        description="Size of the distance weight LUT in bytes. When the LUT is full"
+        " the least recently used nodes are evicted. Default is 200 MB.",
+    )
+    cache_lut: bool = Field(
+        default=False,
+        description="Cache the weights of the octree nodes in the user's cache"
+        " directory. Runs with the same octree, stations and weight parameters load"
+        " them from disk. Only used if all octree nodes fit into the LUT."
+        " Default is False.",
     )
 
-    _node_lut: dict[bytes, np.ndarray] = PrivateAttr()
-    _cached_stations_indices: dict[str, int] = PrivateAttr()
+    _node_lut: np.ndarray = PrivateAttr()
+    # Node hash to LUT row, rows 0..len-1 are occupied
+    _node_lut_rows: dict[bytes, int] = PrivateAttr(default_factory=dict)
+    _node_lut_hashes: list[bytes] = PrivateAttr(default_factory=list)
+    # Lookup clock of the last use of each row, for least recently used eviction
+    _node_lut_last_use: np.ndarray = PrivateAttr()
+    _node_lut_clock: int = PrivateAttr(0)
+    _node_lut_max_rows: int = PrivateAttr(0)
+    _node_lut_params: tuple[float, ...] = PrivateAttr(())
+    _stations: Stations = PrivateAttr()
+    _station_indices_cache: tuple[Stations, list, tuple, np.ndarray | None] | None = (
+        PrivateAttr(None)
+    )
     _station_coords_ecef: np.ndarray = PrivateAttr()
 
-    def get_distances(self, nodes: Iterable[Node]) -> np.ndarray:
+    @property
+    def cache_dir(self) -> Path:
+        path = CACHE_DIR / "distance_weights"
+        path.mkdir(exist_ok=True)
+        return path
+
+    @staticmethod
+    def _get_node_coords_ecef(nodes: Iterable[Node]) -> np.ndarray:
         node_coords = get_node_coordinates(nodes, system="geographic")
-        node_coords = np.array(od.geodetic_to_ecef(*node_coords.T)).T
-        return np.linalg.norm(
-            self._station_coords_ecef - node_coords[:, np.newaxis], axis=2
+        return np.column_stack(od.geodetic_to_ecef(*node_coords.T))
+
+    def get_distances(
+        self,
+        nodes: Iterable[Node],
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        return array_tools.pairwise_distances(
+            self._get_node_coords_ecef(nodes), self._station_coords_ecef, out=out
         )
 
-    def calc_weights_exp(self, distances: np.ndarray) -> np.ndarray:
+    def _scaled_distances_pow(
+        self,
+        distances: np.ndarray,
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Returns (distances / radius) ** exponent, in a new array or in out."""
         exp = self.exponent
-        # radius = distances.min(axis=1)[:, np.newaxis]
-        radius = self.radius_meters
-        return np.exp(-(distances**exp) / (radius**exp))
+        scaled = np.multiply(distances, 1.0 / self.radius_meters, out=out)
+        if exp == 3.0:
+            scaled *= np.square(scaled)
+        else:
+            np.power(scaled, exp, out=scaled)
+        return scaled
 
-    def calc_weights(self, distances: np.ndarray) -> np.ndarray:
-        exp = self.exponent
-        radius = self.radius_meters
-        return (1 - self.waterlevel) / (
-            1 + (distances / radius) ** exp
-        ) + self.waterlevel
+    def _calc_weights_exp(self, distances: np.ndarray, out: np.ndarray) -> None:
+        weights = self._scaled_distances_pow(distances, out=out)
+        np.negative(weights, out=weights)
+        np.exp(weights, out=weights)
+
+    def _calc_weights(self, distances: np.ndarray, out: np.ndarray) -> None:
+        waterlevel = self.waterlevel
+        weights = self._scaled_distances_pow(distances, out=out)
+        weights += 1.0
+        np.reciprocal(weights, out=weights)
+        if waterlevel:
+            weights *= 1.0 - waterlevel
+            weights += waterlevel
+
+    @staticmethod
+    def _apply_blocked(
+        func: Callable[[np.ndarray, np.ndarray], None],
+        distances: np.ndarray,
+        out: np.ndarray | None,
+    ) -> np.ndarray:
+        """Apply an elementwise weight function in cache-sized blocks."""
+        if out is None:
+            out = np.empty_like(distances, dtype=np.result_type(distances, np.float32))
+        if not out.flags.c_contiguous:
+            func(distances, out)
+            return out
+        flat_distances = distances.reshape(-1)
+        flat_out = out.reshape(-1)
+        for start in range(0, flat_out.size, WEIGHTS_BLOCK_SIZE):
+            block = slice(start, start + WEIGHTS_BLOCK_SIZE)
+            func(flat_distances[block], flat_out[block])
+        return out
+
+    def calc_weights_exp(
+        self,
+        distances: np.ndarray,
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        return self._apply_blocked(self._calc_weights_exp, distances, out)
+
+    def calc_weights(
+        self,
+        distances: np.ndarray,
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        return self._apply_blocked(self._calc_weights, distances, out)
+
+    def _get_lut_params(self) -> tuple[float, ...]:
+        return (self.exponent, float(self.radius_meters), self.waterlevel)
+
+    def _check_lut_params(self) -> None:
+        """Clear the LUT if the weight function changed since it was filled."""
+        if self._node_lut_params != self._get_lut_params():
+            logger.debug("distance weight parameters changed, clearing LUT")
+            self._clear_lut()
+            self._node_lut_params = self._get_lut_params()
+
+    def _clear_lut(self) -> None:
+        self._node_lut_rows = {}
+        self._node_lut_hashes = []
+        self._node_lut_last_use = np.zeros(self._node_lut.shape[0], dtype=np.int64)
 
     def prepare(self, stations: Stations, octree: Octree) -> None:
         logger.info("preparing distance weights")
@@ -75,67 +179,225 @@ class DistanceWeights(BaseModel):
                 self.radius_meters,
             )
 
-        bytes_per_node = stations.n_stations * np.float32().itemsize
-        lru_cache_size = int(self.lut_cache_size / bytes_per_node)
-        self._node_lut = LRU(size=lru_cache_size)
+        bytes_per_node = stations.n_stations * np.dtype(LUT_DTYPE).itemsize
+        self._node_lut_max_rows = max(int(self.lut_cache_size / bytes_per_node), 1)
+        self._node_lut = np.empty(
+            (min(octree.n_nodes, self._node_lut_max_rows), stations.n_stations),
+            dtype=LUT_DTYPE,
+        )
+        self._clear_lut()
+        self._node_lut_params = self._get_lut_params()
 
         sta_coords = stations.get_coordinates(system="geographic")
-        self._station_coords_ecef = np.array(od.geodetic_to_ecef(*sta_coords.T)).T
-        self._cached_stations_indices = {
-            sta.nsl.pretty: idx for idx, sta in enumerate(stations)
+        self._station_coords_ecef = np.column_stack(od.geodetic_to_ecef(*sta_coords.T))
+        # Frozen copy, the LUT columns follow the station order at this point
+        self._stations = Stations.model_construct(stations=list(stations))
+
+        nodes = octree.nodes
+        if self.cache_lut and len(nodes) > self._node_lut_max_rows:
+            logger.warning(
+                "octree has more nodes than fit into the distance weight LUT,"
+                " not caching weights on disk"
+            )
+        elif self.cache_lut:
+            cache_file = self._get_lut_cache_file(nodes)
+            if not self._load_lut(cache_file, nodes):
+                self.fill_lut(nodes)
+                self._save_lut(cache_file, n_rows=len(nodes))
+            return
+        self.fill_lut(nodes[: self._node_lut_max_rows])
+
+    def _get_lut_cache_file(self, nodes: Sequence[Node]) -> Path:
+        lut_hash = sha1(np.dtype(LUT_DTYPE).str.encode())
+        lut_hash.update(struct.pack("ddd", *self._get_lut_params()))
+        lut_hash.update(self._station_coords_ecef.tobytes())
+        # Node hashes do not cover the full octree location, key on the geometry
+        lut_hash.update(self._get_node_coords_ecef(nodes).tobytes())
+        return self.cache_dir / f"{lut_hash.hexdigest()}.npy"
+
+    def _load_lut(self, file: Path, nodes: Sequence[Node]) -> bool:
+        if not file.exists():
+            return False
+        # Copy-on-write, refills of the LUT must not modify the cache file
+        node_lut = np.load(file, mmap_mode="c")
+        if node_lut.shape != (len(nodes), self._stations.n_stations):
+            logger.warning("ignoring invalid distance weight cache %s", file)
+            return False
+        logger.info("loading cached distance weights from %s", file)
+        self._node_lut = node_lut
+        self._clear_lut()
+        self._node_lut_hashes = [node.hash() for node in nodes]
+        self._node_lut_rows = {
+            node_hash: idx for idx, node_hash in enumerate(self._node_lut_hashes)
         }
-        self.fill_lut(nodes=octree.nodes)
+        return True
+
+    def _save_lut(self, file: Path, n_rows: int) -> None:
+        logger.info("caching distance weights in %s", file)
+        tmp_file = file.with_suffix(".tmp")
+        with tmp_file.open("wb") as f:
+            np.save(f, self._node_lut[:n_rows])
+        tmp_file.rename(file)
 
-    def fill_lut(self, nodes: Sequence[Node]) -> None:
+    def _reserve_lut(self, n_rows: int) -> None:
+        capacity = self._node_lut.shape[0]
+        if n_rows <= capacity:
+            return
+        capacity = min(max(n_rows, capacity * 2), self._node_lut_max_rows)
+        node_lut = np.empty((capacity, self._node_lut.shape[1]), dtype=LUT_DTYPE)
+        last_use = np.zeros(capacity, dtype=np.int64)
+        n_filled = len(self._node_lut_rows)
+        node_lut[:n_filled] = self._node_lut[:n_filled]
+        last_use[:n_filled] = self._node_lut_last_use[:n_filled]
+        self._node_lut = node_lut
+        self._node_lut_last_use = last_use
+
+    def _allocate_lut_rows(self, n_rows: int) -> list[int]:
+        """Allocate up to n_rows LUT rows, evicting least recently used rows.
+
+        Rows used at the current lookup clock are never evicted.
+
+        Args:
+            n_rows (int): Number of rows to allocate.
+
+        Returns:
+            list[int]: Allocated rows, fewer than n_rows if the LUT is too small.
+        """
+        node_rows = self._node_lut_rows
+        hashes = self._node_lut_hashes
+        n_filled = len(node_rows)
+        n_append = min(n_rows, self._node_lut_max_rows - n_filled)
+        self._reserve_lut(n_filled + n_append)
+        rows = list(range(n_filled, n_filled + n_append))
+        hashes.extend([b""] * n_append)
+
+        last_use = self._node_lut_last_use[:n_filled]
+        n_evict = min(
+            n_rows - n_append,
+            int(np.count_nonzero(last_use < self._node_lut_clock)),
+        )
+        if n_evict:
+            evict_rows = np.argpartition(last_use, n_evict - 1)[:n_evict].tolist()
+            for row in evict_rows:
+                del node_rows[hashes[row]]
+            rows.extend(evict_rows)
+            logger.debug("evicted %d nodes from distance weight LUT", n_evict)
+        return rows
+
+    def _fill_lut(self, nodes: Sequence[Node]) -> tuple[np.ndarray, np.ndarray]:
+        """Fill the LUT and return the rows and weights of the nodes."""
         logger.debug("filling distance weight LUT for %d nodes", len(nodes))
-        distances = self.get_distances(nodes)
-        node_lut = self._node_lut
-        for node, sta_distances in zip(nodes, distances, strict=True):
-            sta_distances = sta_distances.astype(np.float32)
-            sta_distances.setflags(write=False)
-            node_lut[node.hash()] = sta_distances
+        weights = self.calc_weights(self.get_distances(nodes)).astype(LUT_DTYPE)
+
+        rows = self._allocate_lut_rows(len(nodes))
+        n_stored = len(rows)
+        self._node_lut[rows] = weights[:n_stored]
+        self._node_lut_last_use[rows] = self._node_lut_clock
+        node_rows = self._node_lut_rows
+        hashes = self._node_lut_hashes
+        for node, row in zip(nodes[:n_stored], rows, strict=True):
+            node_hash = node.hash()
+            node_rows[node_hash] = row
+            hashes[row] = node_hash
+
+        lut_rows = np.full(len(nodes), -1, dtype=int)
+        lut_rows[:n_stored] = rows
+        return lut_rows, weights
+
+    def fill_lut(self, nodes: Sequence[Node]) -> np.ndarray:
+        """Fill the LUT with the station weights of the nodes.
+
+        When the LUT is full, the least recently used nodes are evicted. Nodes
+        exceeding the size of the LUT are not stored.
+
+        Args:
+            nodes (Sequence[Node]): Nodes to fill.
+
+        Returns:
+            np.ndarray: LUT row indices of the nodes, -1 for nodes not stored.
+        """
+        self._node_lut_clock += 1
+        rows, _ = self._fill_lut(nodes)
+        return rows
 
     def get_node_weights(self, node: Node, stations: list[Station]) -> np.ndarray:
-        try:
-            distances = self._node_lut[node.hash()]
-        except KeyError:
-            self.fill_lut([node])
-            return self.get_node_weights(node, stations)
-        return self.calc_weights(distances)
+        return self._get_lut_weights([node], stations)[0]
 
     def lut_fill_level(self) -> float:
         """Return the fill level of the LUT as a float between 0.0 and 1.0."""
-        return len(self._node_lut) / self._node_lut.get_size()
+        return len(self._node_lut_rows) / self._node_lut_max_rows
 
     async def get_weights(
         self, nodes: Sequence[Node], stations: Stations
     ) -> np.ndarray:
-        n_nodes = len(nodes)
-        station_indices = np.fromiter(
-            (self._cached_stations_indices[sta.nsl.pretty] for sta in stations),
+        return self._get_lut_weights(nodes, stations)
+
+    def _get_station_indices(self, stations: Iterable[Station]) -> np.ndarray | None:
+        """Returns the LUT columns of the stations, None selects all columns.
+
+        The indices of the last queried Stations are reused while its station
+        list and blacklist are unchanged.
+        """
+        if isinstance(stations, Stations):
+            cache_key = (len(stations.stations), len(stations.blacklist))
+            cached = self._station_indices_cache
+            if (
+                cached
+                and cached[0] is stations
+                and cached[1] is stations.stations
+                and cached[2] == cache_key
+            ):
+                return cached[3]
+
+        station_indices = self._stations.get_indices(stations)
+        if station_indices.size == self._node_lut.shape[1] and np.array_equal(
+            station_indices, np.arange(station_indices.size)
+        ):
+            station_indices = None
+        if isinstance(stations, Stations):
+            self._station_indices_cache = (
+                stations,
+                stations.stations,
+                cache_key,
+                station_indices,
+            )
+        return station_indices
+
+    def _get_lut_weights(
+        self, nodes: Sequence[Node], stations: Iterable[Station]
+    ) -> np.ndarray:
+        """Gather the weights from the LUT, filling all missing nodes at once."""
+        station_indices = self._get_station_indices(stations)
+        self._check_lut_params()
+        node_rows = self._node_lut_rows
+        rows = np.fromiter(
+            (node_rows.get(node.hash(), -1) for node in nodes),
             dtype=int,
+            count=len(nodes),
         )
-        distances = np.zeros(shape=(n_nodes, stations.n_stations), dtype=np.float32)
-
-        fill_nodes = []
-        node_lut = self._node_lut
-        for idx, node in enumerate(nodes):
-            try:
-                distances[idx] = node_lut[node.hash()][station_indices]
-            except KeyError:
-                fill_nodes.append(node)
-                continue
-
-        if fill_nodes:
-            self.fill_lut(fill_nodes)
-            cache_hits, cache_misses = node_lut.get_stats()
-            total_hits = cache_hits + cache_misses
-            cache_hit_rate = cache_hits / (total_hits or 1)
+
+        # Rows used by this lookup are not evicted by the fill below
+        self._node_lut_clock += 1
+        missing = rows < 0
+        self._node_lut_last_use[rows[~missing]] = self._node_lut_clock
+
+        missing_idx = np.flatnonzero(missing)
+        if missing_idx.size:
+            missing_rows, missing_weights = self._fill_lut(
+                [nodes[idx] for idx in missing_idx]
+            )
+            rows[missing_idx] = missing_rows
             logger.debug(
-                "node LUT cache fill level %.1f%%, cache hit rate %.1f%%",
+                "distance weight LUT fill level %.1f%%",
                 self.lut_fill_level() * 100,
-                cache_hit_rate * 100,
             )
-            return await self.get_weights(nodes, stations)
 
-        return self.calc_weights(distances)
+        # Two 1D takes are considerably faster than one 2D fancy index
+        weights = self._node_lut.take(rows, axis=0, mode="clip")
+        if missing_idx.size and missing_rows[-1] < 0:
+            # More nodes requested than the LUT holds, these were not stored
+            not_stored = missing_rows < 0
+            weights[missing_idx[not_stored]] = missing_weights[not_stored]
+        if station_indices is not None:
+            weights = weights.take(station_indices, axis=1)
+        return weights.astype(np.float32, copy=False)
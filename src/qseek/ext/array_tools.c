@@ -4,6 +4,7 @@
 #include "numpy/arrayobject.h"
 #include <Python.h>
 #include <float.h>
+#include <math.h>
 #include <omp.h>
 
 static inline npy_intp min_intp(npy_intp a, npy_intp b) {
@@ -150,12 +151,304 @@ static PyObject *argmax(PyObject *module, PyObject *args, PyObject *kwds) {
                        (PyObject *)result_max_values);
 }
 
+static PyObject *shifts_weights(PyObject *module, PyObject *args,
+                                PyObject *kwds) {
+  PyObject *obj, *result_shifts, *result_weights;
+  PyObject *distance_weights = Py_None;
+  PyArrayObject *traveltimes_arr, *distance_weights_arr = NULL;
+
+  npy_intp *shape, i_node, n_nodes, i_station, n_stations, ix;
+  float *traveltimes_data, *distance_weights_data = NULL, *weights_data;
+  npy_int32 *shifts_data;
+  float traveltime, node_weight, weights_sum, scale, sample_scale;
+  double delta_t, weight;
+
+  int n_threads = 8;
+
+  static char *kwlist[] = {"traveltimes",      "delta_t",   "weight",
+                           "distance_weights", "n_threads", NULL};
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "Odd|Oi", kwlist, &obj,
+                                   &delta_t, &weight, &distance_weights,
+                                   &n_threads))
+    return NULL;
+
+  if (!PyArray_Check(obj)) {
+    PyErr_SetString(PyExc_ValueError, "traveltimes is not a NumPy array");
+    return NULL;
+  }
+  traveltimes_arr = (PyArrayObject *)obj;
+  if (PyArray_TYPE(traveltimes_arr) != NPY_FLOAT) {
+    PyErr_SetString(PyExc_ValueError, "Bad dtype, only float32 is supported.");
+    return NULL;
+  }
+  if (PyArray_NDIM(traveltimes_arr) != 2) {
+    PyErr_SetString(PyExc_ValueError, "traveltimes is not 2D");
+    return NULL;
+  }
+  if (!PyArray_IS_C_CONTIGUOUS(traveltimes_arr)) {
+    PyErr_SetString(PyExc_ValueError, "traveltimes is not C contiguous");
+    return NULL;
+  }
+  if (delta_t <= 0.0) {
+    PyErr_SetString(PyExc_ValueError, "delta_t must be greater than 0");
+    return NULL;
+  }
+  if (n_threads < 0) {
+    PyErr_SetString(PyExc_ValueError, "n_threads must be greater than 0");
+    return NULL;
+  }
+
+  if (n_threads == 0)
+    n_threads = omp_get_max_threads();
+
+  shape = PyArray_DIMS(traveltimes_arr);
+  n_nodes = shape[0];
+  n_stations = shape[1];
+
+  if (distance_weights != Py_None) {
+    if (!PyArray_Check(distance_weights)) {
+      PyErr_SetString(PyExc_ValueError,
+                      "distance_weights is not a NumPy array");
+      return NULL;
+    }
+    distance_weights_arr = (PyArrayObject *)distance_weights;
+    if (PyArray_TYPE(distance_weights_arr) != NPY_FLOAT) {
+      PyErr_SetString(PyExc_ValueError,
+                      "Bad dtype, only float32 distance_weights is supported.");
+      return NULL;
+    }
+    if (!PyArray_SAMESHAPE(traveltimes_arr, distance_weights_arr)) {
+      PyErr_SetString(PyExc_ValueError,
+                      "distance_weights shape does not match traveltimes");
+      return NULL;
+    }
+    if (!PyArray_IS_C_CONTIGUOUS(distance_weights_arr)) {
+      PyErr_SetString(PyExc_ValueError, "distance_weights is not C contiguous");
+      return NULL;
+    }
+    distance_weights_data = (float *)PyArray_DATA(distance_weights_arr);
+  }
+
+  result_shifts = PyArray_EMPTY(2, shape, NPY_INT32, 0);
+  result_weights = PyArray_EMPTY(2, shape, NPY_FLOAT32, 0);
+  if (result_shifts == NULL || result_weights == NULL) {
+    Py_XDECREF(result_shifts);
+    Py_XDECREF(result_weights);
+    return NULL;
+  }
+  shifts_data = (npy_int32 *)PyArray_DATA((PyArrayObject *)result_shifts);
+  weights_data = (float *)PyArray_DATA((PyArrayObject *)result_weights);
+  traveltimes_data = (float *)PyArray_DATA(traveltimes_arr);
+  sample_scale = (float)(-1.0 / delta_t);
+
+  Py_BEGIN_ALLOW_THREADS;
+#pragma omp parallel for num_threads(n_threads) schedule(static) private(      \
+        i_station, ix, traveltime, node_weight, weights_sum, scale)
+  for (i_node = 0; i_node < n_nodes; i_node++) {
+    weights_sum = 0.0f;
+    for (i_station = 0; i_station < n_stations; i_station++) {
+      ix = i_node * n_stations + i_station;
+      traveltime = traveltimes_data[ix];
+      if (isnan(traveltime)) {
+        shifts_data[ix] = 0;
+        weights_data[ix] = 0.0f;
+        continue;
+      }
+      shifts_data[ix] = (npy_int32)rintf(traveltime * sample_scale);
+      node_weight = (float)weight;
+      if (distance_weights_data != NULL)
+        node_weight *= distance_weights_data[ix];
+      weights_data[ix] = node_weight;
+      weights_sum += node_weight;
+    }
+
+    scale = weights_sum > 0.0f ? 1.0f / weights_sum : 1.0f;
+    for (i_station = 0; i_station < n_stations; i_station++) {
+      ix = i_node * n_stations + i_station;
+      node_weight = weights_data[ix] * scale;
+      weights_data[ix] = node_weight < 1e-3f ? 0.0f : node_weight;
+    }
+  }
+  Py_END_ALLOW_THREADS;
+
+  return Py_BuildValue("NN", (PyObject *)result_shifts,
+                       (PyObject *)result_weights);
+}
+
+static PyObject *nanminmax(PyObject *module, PyObject *args, PyObject *kwds) {
+  PyObject *obj;
+  PyArrayObject *data_arr;
+
+  npy_intp i_value, n_values;
+  float *data, value, min_value = INFINITY, max_value = -INFINITY;
+
+  int n_threads = 8;
+
+  static char *kwlist[] = {"array", "n_threads", NULL};
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|i", kwlist, &obj,
+                                   &n_threads))
+    return NULL;
+
+  if (!PyArray_Check(obj)) {
+    PyErr_SetString(PyExc_ValueError, "array is not a NumPy array");
+    return NULL;
+  }
+  data_arr = (PyArrayObject *)obj;
+  if (PyArray_TYPE(data_arr) != NPY_FLOAT) {
+    PyErr_SetString(PyExc_ValueError, "Bad dtype, only float32 is supported.");
+    return NULL;
+  }
+  if (!PyArray_IS_C_CONTIGUOUS(data_arr)) {
+    PyErr_SetString(PyExc_ValueError, "array is not C contiguous");
+    return NULL;
+  }
+  if (n_threads < 0) {
+    PyErr_SetString(PyExc_ValueError, "n_threads must be greater than 0");
+    return NULL;
+  }
+  if (n_threads == 0)
+    n_threads = omp_get_max_threads();
+
+  n_values = PyArray_SIZE(data_arr);
+  data = (float *)PyArray_DATA(data_arr);
+
+  Py_BEGIN_ALLOW_THREADS;
+#pragma omp parallel for num_threads(n_threads) schedule(static)               \
+    private(value) reduction(min : min_value) reduction(max : max_value)
+  for (i_value = 0; i_value < n_values; i_value++) {
+    value = data[i_value];
+    if (isnan(value))
+      continue;
+    if (value < min_value)
+      min_value = value;
+    if (value > max_value)
+      max_value = value;
+  }
+  Py_END_ALLOW_THREADS;
+
+  if (min_value > max_value) {
+    PyErr_SetString(PyExc_ValueError, "array contains only NaN values");
+    return NULL;
+  }
+  return Py_BuildValue("dd", (double)min_value, (double)max_value);
+}
+
+static PyObject *pairwise_distances(PyObject *module, PyObject *args,
+                                    PyObject *kwds) {
+  PyObject *coords_a, *coords_b, *out = Py_None;
+  PyArrayObject *coords_a_arr, *coords_b_arr, *out_arr;
+  npy_intp n_a, n_b, i_a, i_b;
+  double *a_data, *b_data, ax, ay, az, dx, dy, dz;
+  float *out_data;
+  int n_threads = 8;
+
+  static char *kwlist[] = {"coords_a", "coords_b", "out", "n_threads", NULL};
+
+  if (!PyArg_ParseTupleAndKeywords(args, kwds, "OO|Oi", kwlist, &coords_a,
+                                   &coords_b, &out, &n_threads))
+    return NULL;
+
+  if (!PyArray_Check(coords_a) || !PyArray_Check(coords_b)) {
+    PyErr_SetString(PyExc_ValueError, "coordinates are not NumPy arrays");
+    return NULL;
+  }
+  coords_a_arr = (PyArrayObject *)coords_a;
+  coords_b_arr = (PyArrayObject *)coords_b;
+  if (PyArray_TYPE(coords_a_arr) != NPY_DOUBLE ||
+      PyArray_TYPE(coords_b_arr) != NPY_DOUBLE) {
+    PyErr_SetString(PyExc_ValueError,
+                    "Bad dtype, only float64 coordinates are supported.");
+    return NULL;
+  }
+  if (PyArray_NDIM(coords_a_arr) != 2 || PyArray_NDIM(coords_b_arr) != 2 ||
+      PyArray_DIM(coords_a_arr, 1) != 3 || PyArray_DIM(coords_b_arr, 1) != 3) {
+    PyErr_SetString(PyExc_ValueError, "coordinates must be of shape (N, 3)");
+    return NULL;
+  }
+  if (!PyArray_IS_C_CONTIGUOUS(coords_a_arr) ||
+      !PyArray_IS_C_CONTIGUOUS(coords_b_arr)) {
+    PyErr_SetString(PyExc_ValueError, "coordinates are not C contiguous");
+    return NULL;
+  }
+  if (n_threads < 0) {
+    PyErr_SetString(PyExc_ValueError, "n_threads must be greater than 0");
+    return NULL;
+  }
+  if (n_threads == 0)
+    n_threads = omp_get_max_threads();
+
+  n_a = PyArray_DIM(coords_a_arr, 0);
+  n_b = PyArray_DIM(coords_b_arr, 0);
+
+  if (out == Py_None) {
+    npy_intp dims[2] = {n_a, n_b};
+    out_arr = (PyArrayObject *)PyArray_EMPTY(2, dims, NPY_FLOAT, 0);
+    if (out_arr == NULL)
+      return NULL;
+  } else {
+    if (!PyArray_Check(out)) {
+      PyErr_SetString(PyExc_ValueError, "out is not a NumPy array");
+      return NULL;
+    }
+    out_arr = (PyArrayObject *)out;
+    if (PyArray_TYPE(out_arr) != NPY_FLOAT) {
+      PyErr_SetString(PyExc_ValueError,
+                      "Bad dtype, only float32 out is supported.");
+      return NULL;
+    }
+    if (PyArray_NDIM(out_arr) != 2 || PyArray_DIM(out_arr, 0) != n_a ||
+        PyArray_DIM(out_arr, 1) != n_b) {
+      PyErr_SetString(PyExc_ValueError, "out shape does not match coordinates");
+      return NULL;
+    }
+    if (!PyArray_IS_C_CONTIGUOUS(out_arr) || !PyArray_ISWRITEABLE(out_arr)) {
+      PyErr_SetString(PyExc_ValueError,
+                      "out is not C contiguous or not writeable");
+      return NULL;
+    }
+    Py_INCREF(out_arr);
+  }
+
+  a_data = (double *)PyArray_DATA(coords_a_arr);
+  b_data = (double *)PyArray_DATA(coords_b_arr);
+  out_data = (float *)PyArray_DATA(out_arr);
+
+  Py_BEGIN_ALLOW_THREADS;
+#pragma omp parallel for num_threads(n_threads) schedule(static)               \
+    private(i_b, ax, ay, az, dx, dy, dz)
+  for (i_a = 0; i_a < n_a; i_a++) {
+    ax = a_data[i_a * 3];
+    ay = a_data[i_a * 3 + 1];
+    az = a_data[i_a * 3 + 2];
+    for (i_b = 0; i_b < n_b; i_b++) {
+      dx = ax - b_data[i_b * 3];
+      dy = ay - b_data[i_b * 3 + 1];
+      dz = az - b_data[i_b * 3 + 2];
+      out_data[i_a * n_b + i_b] = (float)sqrt(dx * dx + dy * dy + dz * dz);
+    }
+  }
+  Py_END_ALLOW_THREADS;
+
+  return (PyObject *)out_arr;
+}
+
 static PyMethodDef methods[] = {
     {"fill_zero_bytes", (PyCFunction)(void (*)(void))fill_zero_bytes,
      METH_VARARGS | METH_KEYWORDS, "Fill a numpy array with zero bytes."},
     {"argmax_masked", (PyCFunction)(void (*)(void))argmax,
      METH_VARARGS | METH_KEYWORDS,
      "Find the argmax of a 2D numpy array on axis 0."},
+    {"shifts_weights", (PyCFunction)(void (*)(void))shifts_weights,
+     METH_VARARGS | METH_KEYWORDS,
+     "Convert travel times to stacking shifts and normalized weights."},
+    {"nanminmax", (PyCFunction)(void (*)(void))nanminmax,
+     METH_VARARGS | METH_KEYWORDS,
+     "Find the minimum and maximum of an array, ignoring NaNs."},
+    {"pairwise_distances", (PyCFunction)(void (*)(void))pairwise_distances,
+     METH_VARARGS | METH_KEYWORDS,
+     "Euclidean distances between two sets of 3D coordinates."},
     {NULL, NULL, 0, NULL} /* sentinel */
 };
 
@@ -25,3 +25,60 @@ def argmax_masked(
     Returns:
         The tuple of the argmax index and the value.
     """
+
+def shifts_weights(
+    traveltimes: np.ndarray,
+    delta_t: float,
+    weight: float,
+    distance_weights: np.ndarray | None = None,
+    n_threads: int = 8,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Convert travel times to stacking shifts and normalized weights.
+
+    NaN travel times get a zero shift and zero weight. The weights of each node are
+    normalized to sum to one, weights below 1e-3 are set to zero.
+
+    Args:
+        traveltimes: The travel times, ndim=2 with NxM shape of np.float32 type.
+        delta_t: The sampling interval in seconds.
+        weight: The weight of the image.
+        distance_weights: The distance weights, ndim=2 with NxM shape of np.float32
+            type. Default is None.
+        n_threads: The number of threads to use, 0 uses all. Default is 8.
+
+    Returns:
+        The tuple of the int32 sample shifts and the float32 weights.
+    """
+
+def nanminmax(array: np.ndarray, n_threads: int = 8) -> tuple[float, float]:
+    """Find the minimum and maximum of the array in a single pass, ignoring NaNs.
+
+    Args:
+        array: The data array of np.float32 type.
+        n_threads: The number of threads to use, 0 uses all. Default is 8.
+
+    Returns:
+        The tuple of the minimum and the maximum value.
+
+    Raises:
+        ValueError: If the array contains only NaN values.
+    """
+
+def pairwise_distances(
+    coords_a: np.ndarray,
+    coords_b: np.ndarray,
+    out: np.ndarray | None = None,
+    n_threads: int = 8,
+) -> np.ndarray:
+    """Calculate the euclidean distances between two sets of 3D coordinates.
+
+    Args:
+        coords_a: The first coordinates, ndim=2 with Nx3 shape of np.float64 type.
+        coords_b: The second coordinates, ndim=2 with Mx3 shape of np.float64 type.
+        out: The output array, ndim=2 with NxM shape of np.float32 type.
+            Default is None, a new array is allocated.
+        n_threads: The number of threads to use, 0 uses all. Default is 8.
+
+    Returns:
+        The float32 distances of NxM shape.
+    """
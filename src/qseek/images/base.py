@@ -102,13 +102,23 @@ class WaveformImage:
                 tr.ydata /= tr.ydata.max()
                 tr.ydata *= max_value
 
-    def get_trace_data(self) -> list[np.ndarray]:
+    def get_trace_data(self, dtype: np.dtype | type = np.float32) -> list[np.ndarray]:
         """Get all trace data in a list.
 
+        The data is converted to contiguous arrays of the stacking dtype, traces
+        already in that layout are not copied.
+
+        Args:
+            dtype (np.dtype | type): Data type of the arrays. Defaults to np.float32.
+
         Returns:
             list[np.ndarray]: List of numpy arrays.
         """
-        return [tr.ydata for tr in self.traces if tr.ydata is not None]
+        return [
+            np.ascontiguousarray(tr.ydata, dtype=dtype)
+            for tr in self.traces
+            if tr.ydata is not None
+        ]
 
     def get_offsets(self, reference: datetime) -> np.ndarray:
         """Get traces timing offsets to a reference time in samples.
@@ -194,30 +194,25 @@ class LocalMagnitudeExtractor(EventMagnitudeCalculator):
             logger.warning("No restituted traces found for event %s", event.time)
             return
 
-        if model.max_amplitude == "wood-anderson":
-            traces = [
-                await asyncio.to_thread(
-                    tr.transfer,
-                    transfer_function=WOOD_ANDERSON,
-                    tfade=self.taper_seconds,
-                    cut_off_fading=True,
-                    demean=True,
-                    invert=False,
-                )
-                for tr in traces
-            ]
-        elif model.max_amplitude == "wood-anderson-old":
-            traces = [
-                await asyncio.to_thread(
-                    tr.transfer,
-                    transfer_function=WOOD_ANDERSON_OLD,
-                    tfade=self.taper_seconds,
-                    cut_off_fading=True,
-                    demean=True,
-                    invert=False,
+        if model.max_amplitude in ("wood-anderson", "wood-anderson-old"):
+            transfer_function = (
+                WOOD_ANDERSON
+                if model.max_amplitude == "wood-anderson"
+                else WOOD_ANDERSON_OLD
+            )
+            traces = await asyncio.gather(
+                *(
+                    asyncio.to_thread(
+                        tr.transfer,
+                        transfer_function=transfer_function,
+                        tfade=self.taper_seconds,
+                        cut_off_fading=True,
+                        demean=True,
+                        invert=False,
+                    )
+                    for tr in traces
                 )
-                for tr in traces
-            ]
+            )
 
         grouped_traces = []
         receivers = []
@@ -167,7 +167,7 @@ class LocalMagnitudeModel:
         try:
             traces = _COMPONENT_MAP[self.component](traces)
         except (KeyError, AttributeError):
-            logger.debug("Could not get channels for %s", receiver.nsl.pretty)
+            logger.debug("Could not get channels for %s", receiver.nsl_pretty)
             return None
         if not traces:
             return None
@@ -4,10 +4,17 @@ import asyncio
 import itertools
 import logging
 from pathlib import Path
-from typing import TYPE_CHECKING, Iterable, Literal, NamedTuple
+from typing import TYPE_CHECKING, Any, Iterable, Literal, NamedTuple
 
 import numpy as np
-from pydantic import DirectoryPath, Field, NewPath, PositiveFloat, PrivateAttr
+from pydantic import (
+    DirectoryPath,
+    Field,
+    NewPath,
+    PositiveFloat,
+    PrivateAttr,
+    constr,
+)
 from pyrocko import gf, io
 
 from qseek.magnitudes.base import (
@@ -43,6 +50,8 @@ logger = logging.getLogger(__name__)
 
 KM = 1e3
 
+NSL_ID_PATTERN = r"^[A-Z0-9]{2}\.[A-Z0-9]{0,5}?\.[A-Z0-9]{0,2}?$"
+
 _TRACE_SELECTORS: dict[PeakAmplitude, ChannelSelector] = {
     "absolute": ChannelSelectors.All,
     "vertical": ChannelSelectors.Vertical,
@@ -64,9 +73,8 @@ def norm_traces(traces: list[Trace]) -> np.ndarray:
 
 
 class PeakAmplitudeDefinition(PeakAmplitudesBase):
-    nsl_id: list[str] | None = Field(
+    nsl_id: list[constr(pattern=NSL_ID_PATTERN)] | None = Field(
         default=None,
-        pattern=r"^[A-Z0-9]{2}\.[A-Z0-9]{0,5}?\.[A-Z0-9]{0,2}?$",
         description="Network, station, location id.",
     )
     peak_amplitude: PeakAmplitude = Field(
@@ -82,6 +90,11 @@ class PeakAmplitudeDefinition(PeakAmplitudesBase):
         description="The frequency range in Hz to filter the traces.",
     )
 
+    _nsls: list[NSL] = PrivateAttr([])
+
+    def model_post_init(self, __context: Any) -> None:
+        self._nsls = [NSL.parse(nsl) for nsl in self.nsl_id or ()]
+
     def filter_receivers_by_nsl(self, receivers: Iterable[Receiver]) -> set[Receiver]:
         """Filters the list of receivers based on the NSL ID.
 
@@ -95,8 +108,7 @@ class PeakAmplitudeDefinition(PeakAmplitudesBase):
             return set(receivers)
 
         matched_receivers = []
-        for nsl in self.nsl_id:
-            nsl = NSL.parse(nsl)
+        for nsl in self._nsls:
             matched_receivers.append([rcv for rcv in receivers if rcv.nsl.match(nsl)])
 
         return set(itertools.chain.from_iterable(matched_receivers))
@@ -173,7 +185,7 @@ class MomentMagnitude(EventMagnitude):
             except (KeyError, AttributeError):
                 continue
             if not rcv_traces:
-                logger.warning("No traces for peak amplitude %s", receiver.nsl.pretty)
+                logger.warning("No traces for peak amplitude %s", receiver.nsl_pretty)
                 continue
 
             station = StationAmplitudes.create(
@@ -184,7 +196,7 @@ class MomentMagnitude(EventMagnitude):
             )
 
             if station.anr < 1.0:
-                logger.warning("Station %s has bad ANR", receiver.nsl.pretty)
+                logger.warning("Station %s has bad ANR", receiver.nsl_pretty)
                 continue
             if station.distance_epi > store.max_distance:
                 continue
@@ -331,22 +343,19 @@ class MomentMagnitudeExtractor(EventMagnitudeCalculator):
             if not traces:
                 continue
 
-            for tr in traces:
-                if store.frequency_range.min != 0.0:
-                    await asyncio.to_thread(
-                        tr.highpass,
-                        4,
-                        store.frequency_range.min,
-                        demean=False,
-                    )
-                await asyncio.to_thread(
-                    tr.lowpass,
-                    4,
-                    store.frequency_range.max,
-                    demean=False,
-                )
+            def filter_trace(tr: Trace, frequency_range: Range) -> None:
+                if frequency_range.min != 0.0:
+                    tr.highpass(4, frequency_range.min, demean=False)
+                tr.lowpass(4, frequency_range.max, demean=False)
                 tr.chop(tr.tmin + self.taper_seconds, tr.tmax - self.taper_seconds)
 
+            await asyncio.gather(
+                *(
+                    asyncio.to_thread(filter_trace, tr, store.frequency_range)
+                    for tr in traces
+                )
+            )
+
             if self.processed_mseed_export is not None:
                 logger.debug(
                     "saving processed mseed traces to %s", self.processed_mseed_export
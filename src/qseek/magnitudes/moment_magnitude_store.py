@@ -4,6 +4,7 @@ import asyncio
 import hashlib
 import itertools
 import logging
+import os
 import struct
 from collections import defaultdict
 from functools import cached_property
@@ -1120,6 +1121,10 @@ class PeakAmplitudesStore(PeakAmplitudesBase):
         file.write_text(self.model_dump_json())
 
 
+def _last_used(stat: os.stat_result) -> float:
+    return max(stat.st_atime, stat.st_mtime)
+
+
 class CacheStats(NamedTuple):
     path: Path
     n_stores: int
@@ -1152,11 +1157,18 @@ class PeakAmplitudeStoreCache:
     def clean_cache(self, keep_files: int = 100) -> None:
         """Clean the cache directory.
 
+        Files are ranked by their last access or modification time, whichever is
+        more recent, so stores which are read often stay cached.
+
         Args:
-            keep_files (int, optional): The number of most recent files to keep in the
-                cache directory. Defaults to 100.
+            keep_files (int, optional): The number of most recently used files to keep
+                in the cache directory. Defaults to 100.
         """
-        files = sorted(self.cache_dir.glob("*"), key=lambda f: f.stat().st_mtime)
+        files = sorted(
+            self.cache_dir.glob("*"),
+            key=lambda f: _last_used(f.stat()),
+            reverse=True,
+        )
         if len(files) <= keep_files:
             return
         logger.info("cleaning cache directory %s", self.cache_dir)
@@ -1171,9 +1183,12 @@ class PeakAmplitudeStoreCache:
         """
         n_stores = 0
         nbytes = 0
-        for file in self.cache_dir.glob("*.json"):
-            n_stores += 1
-            nbytes += file.stat().st_size
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json") or not entry.is_file():
+                    continue
+                n_stores += 1
+                nbytes += entry.stat().st_size
         return CacheStats(path=self.cache_dir, n_stores=n_stores, bytes=nbytes)
 
     def get_cached_stores(
@@ -1191,19 +1206,21 @@ class PeakAmplitudeStoreCache:
         stores = []
         for file in self.cache_dir.glob("*.json"):
             try:
-                store_id, quantity, _ = file.stem.split("-")  # type: ignore
+                file_store_id, file_quantity, _ = file.stem.rsplit("-", 2)
             except ValueError:
                 logger.warning("Invalid file name %s, deleting file", file)
                 file.unlink()
+                continue
 
-            if store_id == store_id and quantity == quantity:
-                try:
-                    store = PeakAmplitudesStore.model_validate_json(file.read_text())
-                except ValidationError:
-                    logger.warning("Invalid store %s, deleting file", file)
-                    file.unlink()
-                    continue
-                stores.append(store)
+            if file_store_id != store_id or file_quantity != quantity:
+                continue
+            try:
+                store = PeakAmplitudesStore.model_validate_json(file.read_bytes())
+            except ValidationError:
+                logger.warning("Invalid store %s, deleting file", file)
+                file.unlink()
+                continue
+            stores.append(store)
         return stores
 
     def get_store(self, selector: PeakAmplitudesBase) -> PeakAmplitudesStore:
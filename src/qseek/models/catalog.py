@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from functools import partial
 from pathlib import Path
 from typing import TYPE_CHECKING, ClassVar, Iterator
 
@@ -27,6 +30,8 @@ from qseek.utils import Symbols, time_to_path
 if TYPE_CHECKING:
     from pyrocko.gui.marker import EventMarker, PhaseMarker
 
+SEMBLANCE_TRACE_MIN = 1e-6
+
 
 class EventCatalogStats(Stats):
     n_detections: int = 0
@@ -75,6 +80,7 @@ class EventCatalog(BaseModel):
     events: list[EventDetection] = []
 
     _stats: ClassVar[EventCatalogStats] = EventCatalogStats()
+    _semblance_writer: ThreadPoolExecutor | None = PrivateAttr(None)
 
     @property
     def n_events(self) -> int:
@@ -164,19 +170,43 @@ class EventCatalog(BaseModel):
         # This has to happen after the markers are saved, cache is cleared
         await detection.save(self.rundir, jitter_location=jitter_location)
 
-    def save_semblance_trace(self, trace: Trace) -> None:
+    async def save_semblance_trace(self, trace: Trace) -> None:
         """Add semblance trace to detection and save to file.
 
+        Traces of batches without semblance above SEMBLANCE_TRACE_MIN (1e-6) are
+        not saved, to keep quiet periods out of the file. The trace in
+        `semblance.mseed` is therefore not continuous, skipped batches leave gaps.
+        The file is appended by a single writer thread, keeping the traces in order.
+
         Args:
             trace (Trace): semblance trace.
         """
+        if trace.ydata is None or not trace.ydata.size:
+            return
+        if trace.ydata.max() <= SEMBLANCE_TRACE_MIN:
+            logger.debug("skipping empty semblance trace at %s", trace.tmin)
+            return
         trace.set_station("SEMBL")
-        io.save(
-            trace,
-            str(self.rundir / "semblance.mseed"),
-            append=True,
+        if self._semblance_writer is None:
+            self._semblance_writer = ThreadPoolExecutor(max_workers=1)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            self._semblance_writer,
+            partial(
+                io.save,
+                trace,
+                str(self.rundir / "semblance.mseed"),
+                append=True,
+            ),
         )
 
+    async def close(self) -> None:
+        """Finish pending semblance trace writes and shut down the writer thread."""
+        if self._semblance_writer is None:
+            return
+        writer, self._semblance_writer = self._semblance_writer, None
+        await asyncio.to_thread(writer.shutdown, wait=True)
+
     @classmethod
     def last_modification(cls, rundir: Path) -> datetime:
         """Last modification of the event file.
@@ -418,22 +418,19 @@ class EventReceivers(BaseModel):
             codes=[tr.nslc_id for tr in traces],
         )
 
-        def get_response(tr: Trace) -> Any:
-            for response in responses:
-                if response.codes[:4] == tr.nslc_id:
-                    return response
-            raise AttributeError(f"cannot find response for {tr.nslc_id}")
+        trace_responses: dict[tuple[str, ...], Any] = {}
+        for response in responses:
+            trace_responses.setdefault(tuple(response.codes[:4]), response)
 
-        restituted_traces = []
+        restitute_traces = []
         for tr in traces:
-            try:
-                response = get_response(tr)
-            except AttributeError:
+            response = trace_responses.get(tuple(tr.nslc_id))
+            if response is None:
                 logger.debug("cannot find response for %s", ".".join(tr.nslc_id))
                 continue
 
-            restituted_traces.append(
-                await asyncio.to_thread(
+            restitute_traces.append(
+                asyncio.to_thread(
                     tr.transfer,
                     transfer_function=response.get_effective(input_quantity=quantity),
                     freqlimits=freqlimits,
@@ -443,7 +440,8 @@ class EventReceivers(BaseModel):
                     invert=True,
                 )
             )
-        return restituted_traces
+        # Restitute traces concurrently, the transfer releases the GIL in the FFT
+        return list(await asyncio.gather(*restitute_traces))
 
     def get_receiver(self, nsl: NSL) -> Receiver:
         """Get the receiver object based on given NSL tuple.
@@ -476,13 +474,14 @@ class EventReceivers(BaseModel):
         Raises:
             KeyError: If a station is not found in the receiver set
         """
-        receivers = [Receiver.from_station(sta) for sta in stations]
-        for receiver, arrival in zip(receivers, phase_arrivals, strict=True):
+        receivers = {receiver.nsl: receiver for receiver in self.receivers}
+        for station, arrival in zip(stations, phase_arrivals, strict=True):
             if not arrival:
                 continue
-            try:
-                receiver = self.get_by_nsl(receiver.nsl)
-            except KeyError:
+            receiver = receivers.get(station.nsl)
+            if receiver is None:
+                receiver = Receiver.from_station(station)
+                receivers[receiver.nsl] = receiver
                 self.receivers.append(receiver)
             receiver.add_phase_detection(arrival)
 
@@ -813,9 +812,9 @@ class EventDetection(Location):
             for arrival in receiver.phase_arrivals.values():
                 if not arrival.observed and observed_only:
                     continue
-                if receiver.nsl.pretty in azimuths:
+                if receiver.nsl_pretty in azimuths:
                     continue
-                azimuths[receiver.nsl.pretty] = self.azimuth_to(receiver)
+                azimuths[receiver.nsl_pretty] = self.azimuth_to(receiver)
         return azimuths
 
     def get_azimuthal_coverage(self, observed_only: bool = True) -> float:
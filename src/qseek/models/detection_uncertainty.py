@@ -46,11 +46,9 @@ class DetectionUncertainty(BaseModel):
         if not source_node.semblance:
             raise ValueError("Source node must have semblance value.")
 
-        nodes = octree.get_nodes_by_threshold(
-            semblance_threshold=source_node.semblance * (1.0 - percentile)
-        )
-        vicinity_coords = np.array(
-            [(node.east, node.north, node.depth) for node in nodes]
+        vicinity_coords = octree.get_coordinates_by_threshold(
+            semblance_threshold=source_node.semblance * (1.0 - percentile),
+            system="raw",
         )
         relative_node_offsets = vicinity_coords - np.array(
             [source_node.east, source_node.north, source_node.depth]
@@ -14,6 +14,21 @@ if TYPE_CHECKING:
 
 CoordSystem = Literal["cartesian", "geographic", "raw"]
 
+_ECEF_E2 = 2 * od.earth_oblateness - od.earth_oblateness**2
+
+
+def _geodetic_to_ecef(lat: float, lon: float, alt: float) -> tuple[float, ...]:
+    """Scalar version of :func:`pyrocko.orthodrome.geodetic_to_ecef`."""
+    lat, lon = math.radians(lat), math.radians(lon)
+    sin_lat = math.sin(lat)
+    cos_lat = math.cos(lat)
+    normal = od.earthradius_equator / math.sqrt(1.0 - _ECEF_E2 * sin_lat**2)
+    return (
+        (normal + alt) * cos_lat * math.cos(lon),
+        (normal + alt) * cos_lat * math.sin(lon),
+        (normal * (1.0 - _ECEF_E2) + alt) * sin_lat,
+    )
+
 
 class Location(BaseModel):
     lat: float = Field(
@@ -97,10 +112,8 @@ class Location(BaseModel):
                 (self.north_shift - other.north_shift) ** 2
                 + (self.east_shift - other.east_shift) ** 2
             )
-        return float(
-            od.distance_accurate50m_numpy(
-                *self.effective_lat_lon, *other.effective_lat_lon
-            )[0]
+        return od.distance_accurate50m(
+            *self.effective_lat_lon, *other.effective_lat_lon
         )
 
     def azimuth_to(self, other: Location) -> float:
@@ -139,14 +152,10 @@ class Location(BaseModel):
                 + (self.effective_elevation - other.effective_elevation) ** 2
             )
 
-        sx, sy, sz = od.geodetic_to_ecef(
-            *self.effective_lat_lon, self.effective_elevation
+        return math.dist(
+            _geodetic_to_ecef(*self.effective_lat_lon, self.effective_elevation),
+            _geodetic_to_ecef(*other.effective_lat_lon, other.effective_elevation),
         )
-        ox, oy, oz = od.geodetic_to_ecef(
-            *other.effective_lat_lon, other.effective_elevation
-        )
-
-        return math.sqrt((sx - ox) ** 2 + (sy - oy) ** 2 + (sz - oz) ** 2)
 
     def offset_from(self, other: Location) -> tuple[float, float, float]:
         """Return offset vector (east, north, depth) from other location in [m].
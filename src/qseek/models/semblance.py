@@ -107,6 +107,8 @@ class Semblance:
         self.padding_samples = padding_samples
         self.n_samples_unpadded = n_samples
         self.exponent = exponent
+        # Node-major C layout, parstack and argmax_masked need contiguous node rows.
+        # Time columns are gathered in bulk through get_semblances().
         self.semblance_unpadded = np.array([], dtype=np.float32)
 
         self._start_time = start_time
@@ -166,20 +168,20 @@ class Semblance:
             logger.info(
                 "re-allocating semblance memory: %s", human_readable_bytes(n_values * 4)
             )
+            # Grow the shared allocation, fresh pages are zeroed by the OS
+            allocation = np.zeros(next_ram_array_size(n_values * 4), dtype=np.float32)
             old_semblance = self.semblance_unpadded.ravel()
-            next_size = next_ram_array_size(n_values * 4)
-            self.semblance_unpadded = np.zeros(next_size, dtype=np.float32)
-            # copy old values
             if old_semblance.size:
-                self.semblance_unpadded.ravel()[: old_semblance.size] = old_semblance
+                allocation[: old_semblance.size] = old_semblance
 
-            Semblance._semblance_allocation = self.semblance_unpadded.ravel()
-            self._stats.semblance_allocation_bytes = self.semblance_unpadded.nbytes
-            return await self.set_n_nodes(n_nodes)
+            Semblance._semblance_allocation = allocation
+            self._stats.semblance_allocation_bytes = allocation.nbytes
+            self.semblance_unpadded = allocation[:n_values].reshape(
+                (n_nodes, n_samples)
+            )
 
         self._stats.semblance_size_bytes = self.semblance_unpadded.nbytes
         self._clear_cache()
-        return None
 
     def get_time_from_index(self, index: int) -> datetime:
         """Get the time from a sample index.
@@ -205,6 +207,22 @@ class Semblance:
             return self.semblance[self._leaf_nodes, time_idx]
         return self.semblance[:, time_idx]
 
+    def get_semblances(self, time_indices: np.ndarray) -> np.ndarray:
+        """Get the semblance values at multiple time indices.
+
+        The columns are gathered in a single pass, each returned row is contiguous.
+
+        Parameters:
+            time_indices (np.ndarray): The indices of the desired times.
+
+        Returns:
+            np.ndarray: The semblance values of shape (n-times, n-nodes).
+        """
+        semblances = self.semblance[:, time_indices]
+        if self._leaf_nodes is not None:
+            semblances = semblances[self._leaf_nodes]
+        return np.ascontiguousarray(semblances.T)
+
     def maximum_node_semblance(self) -> np.ndarray:
         semblance = self.semblance.max(axis=1)
         if self.exponent != 1.0:
@@ -359,12 +377,31 @@ class Semblance:
         offsets: np.ndarray,
         shifts: np.ndarray,
         weights: np.ndarray,
+        n_nodes: int | None = None,
         threads: int = 0,
     ) -> None:
+        """Stack traces into the semblance volume.
+
+        Args:
+            trace_data (list[np.ndarray]): Trace data of the image.
+            offsets (np.ndarray): Sample offsets of the traces.
+            shifts (np.ndarray): Sample shifts of shape (n-nodes, n-stations).
+            weights (np.ndarray): Weights of shape (n-nodes, n-stations).
+            n_nodes (int | None, optional): Total number of nodes in the volume.
+                Shifts and weights are stacked into the last rows of the volume.
+                If None, the number of rows in weights is used. Defaults to None.
+            threads (int, optional): Number of threads, 0 uses all available cores
+                minus six for I/O. Defaults to 0.
+        """
         # Hold threads back for I/O
         threads = threads or max(1, get_cpu_count() - 6)
 
-        n_nodes = weights.shape[0]
+        n_nodes_stack = weights.shape[0]
+        n_nodes = n_nodes or n_nodes_stack
+        if n_nodes_stack > n_nodes:
+            raise ValueError(
+                f"cannot stack {n_nodes_stack} nodes into volume of {n_nodes} nodes"
+            )
         await self.set_n_nodes(n_nodes)
 
         start_time = datetime_now()
@@ -375,12 +412,12 @@ class Semblance:
             shifts=shifts,
             weights=weights,
             lengthout=self.n_samples_unpadded,
-            result=self.semblance_unpadded,
+            result=self.semblance_unpadded[n_nodes - n_nodes_stack :],
             dtype=self.semblance_unpadded.dtype,
             method=0,
             nparallel=threads,
         )
-        self._stats.add_stacking_time(datetime_now() - start_time, self.n_nodes)
+        self._stats.add_stacking_time(datetime_now() - start_time, n_nodes_stack)
         if self._offset_samples and self._offset_samples != offset_samples:
             logging.warning(
                 "offset samples changed from %d to %d",
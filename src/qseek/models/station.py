@@ -1,14 +1,24 @@
 from __future__ import annotations
 
 import logging
+from functools import cached_property, lru_cache
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Iterable, Iterator
 
 import numpy as np
-from pydantic import BaseModel, DirectoryPath, Field, FilePath, PositiveFloat
+from pydantic import (
+    BaseModel,
+    DirectoryPath,
+    Field,
+    FilePath,
+    PositiveFloat,
+    PrivateAttr,
+)
+from pyrocko import orthodrome as od
 from pyrocko.io.stationxml import load_xml
 from pyrocko.model import Station as PyrockoStation
 from pyrocko.model import dump_stations_yaml, load_stations
+from scipy.spatial.distance import pdist
 
 from qseek.utils import _NSL, NSL
 
@@ -23,6 +33,32 @@ from qseek.models.location import CoordSystem, Location
 logger = logging.getLogger(__name__)
 
 
+# Station files are keyed by path and modification time, repeated instantiation
+# of Stations in the same process reuses the parsed inventory.
+@lru_cache(maxsize=32)
+def _load_pyrocko_yaml_cached(path: str, mtime_ns: int) -> tuple[PyrockoStation, ...]:
+    return tuple(load_stations(filename=path))
+
+
+@lru_cache(maxsize=32)
+def _load_station_xml_cached(path: str, mtime_ns: int) -> tuple[PyrockoStation, ...]:
+    return tuple(load_xml(filename=path).get_pyrocko_stations())
+
+
+def _load_pyrocko_yaml(file: Path) -> tuple[PyrockoStation, ...]:
+    file = file.expanduser()
+    return _load_pyrocko_yaml_cached(str(file), file.stat().st_mtime_ns)
+
+
+def _load_station_xml(file: Path) -> tuple[PyrockoStation, ...]:
+    file = file.expanduser()
+    try:
+        return _load_station_xml_cached(str(file), file.stat().st_mtime_ns)
+    except StopIteration:
+        logger.error("could not load StationXML file: %s", file)
+        return ()
+
+
 class Station(Location):
     network: str = Field(..., max_length=2)
     station: str = Field(..., max_length=5)
@@ -59,15 +95,23 @@ class Station(Location):
             )
         )
 
-    @property
+    @cached_property
     def nsl(self) -> _NSL:
         """Network Station Location code as tuple.
 
+        The code is cached in the instance `__dict__`, network, station and
+        location are not reassigned after construction.
+
         Returns:
             tuple[str, str, str]: Network, Station, Location
         """
         return _NSL(self.network, self.station, self.location)
 
+    @cached_property
+    def nsl_pretty(self) -> str:
+        """Network Station Location code as string `NET.STA.LOC`."""
+        return f"{self.network}.{self.station}.{self.location}"
+
     def __hash__(self) -> int:
         return hash((super().__hash__(), self.nsl))
 
@@ -97,10 +141,17 @@ class Stations(BaseModel):
         "include stations for detection. If None, all stations are included.",
     )
 
+    _cached_stations: list[Station] | None = PrivateAttr(None)
+    _cache_key: tuple[int, int] = PrivateAttr((0, 0))
+    _cached_coordinates: np.ndarray | None = PrivateAttr(None)
+    _cached_nsl_index: dict[_NSL, Station] | None = PrivateAttr(None)
+    _cached_nsl_indices: dict[_NSL, int] | None = PrivateAttr(None)
+    _cached_n_stations: int | None = PrivateAttr(None)
+
     def model_post_init(self, __context: Any) -> None:
-        loaded_stations = []
+        loaded_stations: list[PyrockoStation] = []
         for file in self.pyrocko_station_yamls:
-            loaded_stations += load_stations(filename=str(file.expanduser()))
+            loaded_stations += _load_pyrocko_yaml(file)
 
         for path in self.station_xmls:
             if path.is_dir():
@@ -110,16 +161,14 @@ class Stations(BaseModel):
             else:
                 continue
             for file in station_xmls:
-                try:
-                    station_xml = load_xml(filename=str(file.expanduser()))
-                except StopIteration:
-                    logger.error("could not load StationXML file: %s", file)
-                    continue
-                loaded_stations += station_xml.get_pyrocko_stations()
+                loaded_stations += _load_station_xml(file)
 
+        seen_stations = {(sta.nsl, sta.as_tuple()) for sta in self.stations}
         for sta in loaded_stations:
             sta = Station.from_pyrocko_station(sta)
-            if sta not in self.stations:
+            key = (sta.nsl, sta.as_tuple())
+            if key not in seen_stations:
+                seen_stations.add(key)
                 self.stations.append(sta)
 
         self.weed_stations()
@@ -129,28 +178,29 @@ class Stations(BaseModel):
         logger.debug("weeding bad stations")
 
         seen_nsls = set()
-        for sta in self.stations.copy():
+        stations = []
+        for sta in self.stations:
             if sta.lat == 0.0 or sta.lon == 0.0:
                 logger.warning(
                     "removing station %s with bad coordinates: lat %.4f, lon %.4f",
-                    sta.nsl.pretty,
+                    sta.nsl_pretty,
                     sta.lat,
                     sta.lon,
                 )
-                self.stations.remove(sta)
                 continue
 
-            if sta.nsl.pretty in seen_nsls:
-                logger.warning("removing duplicate station: %s", sta.nsl.pretty)
-                self.stations.remove(sta)
+            if sta.nsl_pretty in seen_nsls:
+                logger.warning("removing duplicate station: %s", sta.nsl_pretty)
                 continue
-            seen_nsls.add(sta.nsl.pretty)
+            seen_nsls.add(sta.nsl_pretty)
+            stations.append(sta)
+        self.stations = stations
 
         # if not self.stations:
         #     logger.warning("no stations available, add stations to start detection")
 
     def blacklist_station(self, station: Station, reason: str) -> None:
-        logger.warning("blacklisting station %s: %s", station.nsl.pretty, reason)
+        logger.warning("blacklisting station %s: %s", station.nsl_pretty, reason)
         self.blacklist.add(station.nsl)
         if self.n_stations == 0:
             raise ValueError("no stations available, all stations blacklisted")
@@ -166,15 +216,18 @@ class Stations(BaseModel):
             ".".join(code[0:3]) for code in available_squirrel_codes
         }
 
-        n_removed_stations = 0
-        for sta in self.stations.copy():
-            if sta.nsl.pretty not in available_squirrel_nsls:
+        stations = []
+        for sta in self.stations:
+            if sta.nsl_pretty not in available_squirrel_nsls:
                 logger.warning(
                     "removing station %s: no waveforms available in Squirrel",
-                    sta.nsl.pretty,
+                    sta.nsl_pretty,
                 )
-                self.stations.remove(sta)
-                n_removed_stations += 1
+                continue
+            stations.append(sta)
+
+        n_removed_stations = len(self.stations) - len(stations)
+        self.stations = stations
 
         if n_removed_stations:
             logger.warning(
@@ -188,38 +241,76 @@ class Stations(BaseModel):
         logger.info("preparing station inventory")
 
         if self.max_distance is not None:
-            for sta in self.stations.copy():
+            stations = []
+            for sta in self.stations:
                 distance = octree.location.distance_to(sta)
                 if distance > self.max_distance:
                     logger.warning(
                         "removing station %s: distance to octree is %g m",
-                        sta.nsl.pretty,
+                        sta.nsl_pretty,
                         distance,
                     )
-                    self.stations.remove(sta)
+                    continue
+                stations.append(sta)
+            self.stations = stations
+
+    def _check_cache(self) -> None:
+        """Drop cached arrays when the station list or blacklist changed."""
+        cache_key = (len(self.stations), len(self.blacklist))
+        if self._cached_stations is self.stations and self._cache_key == cache_key:
+            return
+        self._cached_stations = self.stations
+        self._cache_key = cache_key
+        self._cached_coordinates = None
+        self._cached_nsl_index = None
+        self._cached_nsl_indices = None
+        self._cached_n_stations = None
 
     def __iter__(self) -> Iterator[Station]:
-        blacklist_pretty = {nsl.pretty for nsl in self.blacklist}
-        return (sta for sta in self.stations if sta.nsl.pretty not in blacklist_pretty)
+        blacklist = self.blacklist
+        return (sta for sta in self.stations if sta.nsl not in blacklist)
 
     def mean_interstation_distance(self) -> float:
         """Calculate the mean interstation distance.
 
+        Like `Location.distance_to`, pairs of stations sharing an origin are
+        measured in cartesian shifts, other pairs in ECEF coordinates.
+
         Returns:
             float: Mean interstation distance in meters.
         """
-        distances = [
-            sta_1.distance_to(sta_2)
-            for sta_1 in self
-            for sta_2 in self
-            if sta_1 is not sta_2
-        ]
+        stations = list(self)
+        shifts = np.array(
+            [
+                (sta.east_shift, sta.north_shift, sta.effective_elevation)
+                for sta in stations
+            ]
+        )
+        origins = np.array([(sta.lat, sta.lon) for sta in stations])
+        _, origin_ids = np.unique(origins, axis=0, return_inverse=True)
+        origin_ids = origin_ids.ravel()
+        if np.all(origin_ids == origin_ids[0]):
+            return float(np.mean(pdist(shifts)))
+
+        distances = pdist(
+            np.column_stack(od.geodetic_to_ecef(*self.get_coordinates().T))
+        )
+        idx_a, idx_b = np.triu_indices(len(stations), k=1)
+        same_origin = origin_ids[idx_a] == origin_ids[idx_b]
+        if same_origin.any():
+            distances[same_origin] = pdist(shifts)[same_origin]
         return float(np.mean(distances))
 
     @property
     def n_stations(self) -> int:
         """Number of stations."""
-        return len(list(self))
+        self._check_cache()
+        if self._cached_n_stations is None:
+            blacklist = self.blacklist
+            self._cached_n_stations = sum(
+                sta.nsl not in blacklist for sta in self.stations
+            )
+        return self._cached_n_stations
 
     @property
     def n_networks(self) -> int:
@@ -241,27 +332,49 @@ class Stations(BaseModel):
         Returns:
             Stations: Containing only selected stations.
         """
-        available_stations = {sta.nsl: sta for sta in self}
+        self._check_cache()
+        if self._cached_nsl_index is None:
+            self._cached_nsl_index = {sta.nsl: sta for sta in self}
+        available_stations = self._cached_nsl_index
         try:
             selected_stations = [
                 available_stations[_NSL(tr.network, tr.station, tr.location)]
                 for tr in traces
             ]
         except KeyError as exc:
-            raise ValueError("could not find a station") from exc
+            raise ValueError(f"could not find station {exc.args[0].pretty}") from exc
 
         return Stations.model_construct(stations=selected_stations)
 
+    def get_indices(self, stations: Iterable[Station]) -> np.ndarray:
+        """Get the indices of stations within these stations.
+
+        Args:
+            stations (Iterable[Station]): Stations to look up.
+
+        Returns:
+            np.ndarray: Integer indices, in the order of iteration.
+
+        Raises:
+            ValueError: If a station is not part of these stations.
+        """
+        self._check_cache()
+        if self._cached_nsl_indices is None:
+            self._cached_nsl_indices = {sta.nsl: idx for idx, sta in enumerate(self)}
+        nsl_indices = self._cached_nsl_indices
+        try:
+            return np.fromiter((nsl_indices[sta.nsl] for sta in stations), dtype=int)
+        except KeyError as exc:
+            raise ValueError(f"could not find station {exc.args[0].pretty}") from exc
+
     def get_centroid(self) -> Location:
         """Get centroid location from all stations.
 
         Returns:
             Location: Centroid Location.
         """
-        centroid_lat, centroid_lon, centroid_elevation = np.mean(
-            [(*sta.effective_lat_lon, sta.elevation) for sta in self],
-            axis=0,
-        )
+        centroid_lat, centroid_lon = self.get_coordinates()[:, :2].mean(axis=0)
+        centroid_elevation = np.mean([sta.elevation for sta in self])
         return Location(
             lat=centroid_lat,
             lon=centroid_lon,
@@ -269,11 +382,29 @@ class Stations(BaseModel):
         )
 
     def get_coordinates(self, system: CoordSystem = "geographic") -> np.ndarray:
+        """Get the coordinates of all stations.
+
+        The array is cached and invalidated when the station list is replaced,
+        grows or shrinks, or when stations are blacklisted.
+
+        Args:
+            system (CoordSystem, optional): Coordinate system.
+                Defaults to "geographic".
+
+        Returns:
+            np.ndarray: Read-only array of shape (n_stations, 3) holding
+                effective latitude, longitude and elevation.
+        """
         if system != "geographic":
             raise NotImplementedError("only geographic coordinates are implemented.")
-        return np.array(
-            [(*sta.effective_lat_lon, sta.effective_elevation) for sta in self]
-        )
+        self._check_cache()
+        if self._cached_coordinates is None:
+            coords = np.empty((self.n_stations, 3))
+            for idx, sta in enumerate(self):
+                coords[idx] = (*sta.effective_lat_lon, sta.effective_elevation)
+            coords.setflags(write=False)
+            self._cached_coordinates = coords
+        return self._cached_coordinates
 
     def as_pyrocko_stations(self) -> list[PyrockoStation]:
         """Convert the stations to PyrockoStation objects.
@@ -300,18 +431,22 @@ class Stations(BaseModel):
         Args:
             filename (Path): Path to CSV file.
         """
-        with filename.open("w") as f:
-            f.write(
-                "network,station,location,latitude,longitude,elevation,depth,WKT_geom\n"
-            )
-            for sta in self:
-                f.write(
-                    f"{sta.network},{sta.station},{sta.location},"
-                    f"{sta.effective_lat},{sta.effective_lon},{sta.elevation},"
-                    f"{sta.depth},{sta.as_wkt()}\n"
-                )
+        lines = ["network,station,location,latitude,longitude,elevation,depth,WKT_geom"]
+        lines.extend(
+            f"{sta.network},{sta.station},{sta.location},"
+            f"{sta.effective_lat},{sta.effective_lon},{sta.elevation},"
+            f"{sta.depth},{sta.as_wkt()}"
+            for sta in self
+        )
+        filename.write_text("\n".join(lines) + "\n")
 
     def export_vtk(self, reference: Location | None = None) -> None: ...
 
+    def __eq__(self, other: object) -> bool:
+        # The cached arrays in the private attributes are not compared
+        if not isinstance(other, BaseModel):
+            return NotImplemented
+        return type(self) is type(other) and self.__dict__ == other.__dict__
+
     def __hash__(self) -> int:
-        return hash(sta for sta in self)
+        return hash(tuple(sta.nsl for sta in self))
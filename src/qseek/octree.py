@@ -37,6 +37,48 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 KM = 1e3
+# Below this many nodes the cached per-node locations are cheaper than vectorizing
+VECTORIZE_MIN_NODES = 16
+
+
+def _get_node_offsets(nodes: Sequence[Node]) -> np.ndarray:
+    """Returns the east, north and depth offsets of nodes, of shape (n-nodes, 3)."""
+    # A flat fromiter is about twice as fast as converting a list of tuples
+    return np.fromiter(
+        (value for node in nodes for value in (node.east, node.north, node.depth)),
+        dtype=float,
+        count=3 * len(nodes),
+    ).reshape(-1, 3)
+
+
+def _get_node_coordinates_geographic(nodes: Sequence[Node]) -> np.ndarray | None:
+    """Vectorized geographic coordinates of nodes sharing one octree.
+
+    Returns:
+        np.ndarray | None: Of shape (n-nodes, 3) with lat, lon and elevation or
+            None if the nodes do not share a single parent octree.
+    """
+    tree = nodes[0].tree
+    if tree is None or any(node.tree is not tree for node in nodes):
+        return None
+    reference = tree.location
+    raw = _get_node_offsets(nodes)
+
+    east_shifts = reference.east_shift + raw[:, 0]
+    north_shifts = reference.north_shift + raw[:, 1]
+    lats = np.full(len(nodes), reference.lat)
+    lons = np.full(len(nodes), reference.lon)
+    # Unshifted nodes keep the exact reference lat/lon, as Location does
+    shifted = (north_shifts != 0.0) | (east_shifts != 0.0)
+    if shifted.any():
+        lats[shifted], lons[shifted] = od.ne_to_latlon(
+            reference.lat,
+            reference.lon,
+            north_shifts[shifted],
+            east_shifts[shifted],
+        )
+    elevations = reference.elevation - (reference.depth + raw[:, 2])
+    return np.column_stack((lats, lons, elevations))
 
 
 def get_node_coordinates(
@@ -44,6 +86,11 @@ def get_node_coordinates(
     system: CoordSystem = "geographic",
 ) -> np.ndarray:
     if system == "geographic":
+        nodes = list(nodes)
+        if len(nodes) >= VECTORIZE_MIN_NODES:
+            coordinates = _get_node_coordinates_geographic(nodes)
+            if coordinates is not None:
+                return coordinates
         node_locations = (node.as_location() for node in nodes)
         return np.array(
             [
@@ -60,7 +107,7 @@ def get_node_coordinates(
             ]
         )
     if system == "raw":
-        return np.array([(node.east, node.north, node.depth) for node in nodes])
+        return _get_node_offsets(list(nodes))
     raise ValueError(f"Unknown coordinate system: {system}")
 
 
@@ -376,6 +423,7 @@ class Octree(BaseModel, Iterator[Node]):
 
     _root_nodes: list[Node] = PrivateAttr([])
     _semblance: np.ndarray | None = PrivateAttr(None)
+    _node_semblance: np.ndarray | None = PrivateAttr(None)
     _cached_coordinates: dict[CoordSystem, np.ndarray] = PrivateAttr({})
     _nodes: list[Node] = PrivateAttr([])
 
@@ -449,6 +497,24 @@ class Octree(BaseModel, Iterator[Node]):
         """Number of nodes in the octree."""
         return len(self.leaf_nodes)
 
+    @cached_property
+    def leaf_node_mask(self) -> np.ndarray:
+        """Boolean mask of the leaf nodes in :attr:`nodes`."""
+        mask = np.fromiter(
+            (node.is_leaf() for node in self.nodes), dtype=bool, count=self.n_nodes
+        )
+        mask.setflags(write=False)
+        return mask
+
+    @cached_property
+    def node_sizes(self) -> np.ndarray:
+        """Edge lengths of all nodes in :attr:`nodes` in meters."""
+        sizes = np.fromiter(
+            (node.size for node in self.nodes), dtype=float, count=self.n_nodes
+        )
+        sizes.setflags(write=False)
+        return sizes
+
     @property
     def nodes(self) -> list[Node]:
         """List of nodes in the octree."""
@@ -491,8 +557,13 @@ class Octree(BaseModel, Iterator[Node]):
             del self.n_leaf_nodes
         with contextlib.suppress(AttributeError):
             del self.leaf_nodes
+        with contextlib.suppress(AttributeError):
+            del self.leaf_node_mask
+        with contextlib.suppress(AttributeError):
+            del self.node_sizes
         self._cached_coordinates.clear()
         self._semblance = None
+        self._node_semblance = None
 
     def reset(self) -> Self:
         """Reset the octree to its initial state and return it."""
@@ -566,7 +637,17 @@ class Octree(BaseModel, Iterator[Node]):
     @property
     def semblance(self) -> np.ndarray:
         """Returns the semblance values of all nodes."""
-        return np.array([node.semblance for node in self])
+        return self._get_node_semblance().copy()
+
+    def _get_node_semblance(self) -> np.ndarray:
+        """Semblance of all nodes, kept in sync by :meth:`map_semblance`."""
+        if self._node_semblance is None:
+            self._node_semblance = np.fromiter(
+                (node.semblance for node in self.nodes),
+                dtype=float,
+                count=self.n_nodes,
+            )
+        return self._node_semblance
 
     def map_semblance(self, semblance: np.ndarray, leaf_only: bool = True) -> None:
         """Maps semblance values to nodes.
@@ -579,8 +660,15 @@ class Octree(BaseModel, Iterator[Node]):
         self._semblance = semblance
         nodes = self.leaf_nodes if leaf_only else self.nodes
 
-        for node, node_semblance in zip(nodes, semblance, strict=True):
-            node.semblance = float(node_semblance)
+        # tolist() converts to Python floats in a single C pass
+        for node, node_semblance in zip(nodes, semblance.tolist(), strict=True):
+            node.semblance = node_semblance
+
+        if self._node_semblance is not None:
+            if leaf_only:
+                self._node_semblance[self.leaf_node_mask] = semblance
+            else:
+                self._node_semblance[:] = semblance
 
     def get_coordinates(self, system: CoordSystem = "geographic") -> np.ndarray:
         if self._cached_coordinates.get(system) is None:
@@ -636,6 +724,30 @@ class Octree(BaseModel, Iterator[Node]):
         """
         return [self[idx] for idx in indices]
 
+    def get_neighbours_mask(self, node_idx: int, leafs_only: bool = True) -> np.ndarray:
+        """Get a mask of the direct neighbours of a node.
+
+        Vectorized equivalent of :meth:`Node.get_neighbours`.
+
+        Args:
+            node_idx (int): Index of the node in :attr:`nodes`.
+            leafs_only (bool): If True, only leaf nodes are marked. Defaults to True.
+
+        Returns:
+            np.ndarray: Boolean mask of shape (n-nodes,).
+        """
+        coordinates = self.get_coordinates(system="raw")
+        sizes = self.node_sizes
+        max_distances = (sizes + sizes[node_idx]) / 2
+        mask = np.all(
+            np.abs(coordinates - coordinates[node_idx]) <= max_distances[:, np.newaxis],
+            axis=1,
+        )
+        if leafs_only:
+            mask &= self.leaf_node_mask
+        mask[node_idx] = False
+        return mask
+
     def get_nodes_by_threshold(self, semblance_threshold: float = 0.0) -> list[Node]:
         """Get all nodes with a semblance above a threshold.
 
@@ -649,6 +761,25 @@ class Octree(BaseModel, Iterator[Node]):
             return list(self)
         return [node for node in self if node.semblance >= semblance_threshold]
 
+    def get_coordinates_by_threshold(
+        self,
+        semblance_threshold: float = 0.0,
+        system: CoordSystem = "raw",
+    ) -> np.ndarray:
+        """Get coordinates of all nodes with a semblance above a threshold.
+
+        Args:
+            semblance_threshold (float): Semblance threshold. Default is 0.0.
+            system (CoordSystem, optional): Coordinate system. Defaults to "raw".
+
+        Returns:
+            np.ndarray: Of shape (n-nodes, 3).
+        """
+        coordinates = self.get_coordinates(system=system)
+        if not semblance_threshold:
+            return coordinates
+        return coordinates[self._get_node_semblance() >= semblance_threshold]
+
     def get_nodes_level(self, level: int = 0) -> list[Node]:
         """Get all nodes at a specific level.
 
@@ -24,6 +24,7 @@ from pydantic import (
 
 from qseek.corrections.corrections import StationCorrectionType
 from qseek.distance_weights import DistanceWeights
+from qseek.ext import array_tools
 from qseek.features import FeatureExtractorType
 from qseek.images.images import ImageFunctions, WaveformImages
 from qseek.magnitudes import EventMagnitudeCalculatorType
@@ -274,7 +275,9 @@ class Search(BaseModel):
     semblance_sampling_rate: SamplingRate = Field(
         default=100,
         description="Sampling rate for the semblance image function. "
-        "Choose from `10, 20, 25, 50, 100, 200 or 400` Hz.",
+        "Choose from `10, 20, 25, 50, 100, 200 or 400` Hz. The stacked semblance"
+        " is saved to `semblance.mseed` in the run directory. The trace is not"
+        " continuous, batches without semblance above 1e-6 are skipped.",
     )
     detection_threshold: PositiveFloat = Field(
         default=0.2,
@@ -353,6 +356,8 @@ class Search(BaseModel):
     _shift_range: timedelta = PrivateAttr(timedelta(seconds=0.0))
     _window_padding: timedelta = PrivateAttr(timedelta(seconds=0.0))
     _distance_range: tuple[float, float] = PrivateAttr((0.0, 0.0))
+    _peak_threshold: float = PrivateAttr(0.0)
+    _peak_distance_samples: int = PrivateAttr(1)
     _travel_time_ranges: dict[PhaseDescription, tuple[timedelta, timedelta]] = (
         PrivateAttr({})
     )
@@ -462,9 +467,13 @@ class Search(BaseModel):
                 self.octree,
                 self.stations,
             )
+            traveltime_min, traveltime_max = await asyncio.to_thread(
+                array_tools.nanminmax,
+                np.ascontiguousarray(traveltimes, dtype=np.float32),
+            )
             self._travel_time_ranges[phase] = (
-                timedelta(seconds=max(0, np.nanmin(traveltimes))),
-                timedelta(seconds=np.nanmax(traveltimes)),
+                timedelta(seconds=max(0, traveltime_min)),
+                timedelta(seconds=traveltime_max),
             )
             logger.info(
                 "time shift ranges: %s / %s - %s",
@@ -492,6 +501,12 @@ class Search(BaseModel):
                 f"{self._shift_range +2*self._window_padding }"
             )
 
+        # Peak detection on the stacked semblance, before applying the power mean
+        self._peak_threshold = self.detection_threshold ** (1.0 / self.power_mean)
+        self._peak_distance_samples = round(
+            self.detection_blinding.total_seconds() * self.semblance_sampling_rate
+        )
+
         logger.info("using trace window padding: %s", self._window_padding)
         logger.info("time shift range %s", self._shift_range)
         logger.info(
@@ -586,7 +601,8 @@ class Search(BaseModel):
         ):
             batch_processing_start = datetime_now()
             images.set_stations(self.stations)
-            images.apply_exponent(self.power_mean)
+            if self.power_mean != 1.0:
+                await asyncio.to_thread(images.apply_exponent, self.power_mean)
             search_block = SearchTraces(
                 parent=self,
                 images=images,
@@ -596,7 +612,9 @@ class Search(BaseModel):
 
             detections, semblance_trace = await search_block.search()
 
-            self._catalog.save_semblance_trace(semblance_trace)
+            BackgroundTasks.create_task(
+                self._catalog.save_semblance_trace(semblance_trace)
+            )
             if detections:
                 BackgroundTasks.create_task(self.new_detections(detections))
 
@@ -608,6 +626,7 @@ class Search(BaseModel):
             self.set_progress(batch.end_time)
 
         await BackgroundTasks.wait_all()
+        await self._catalog.close()
         await self._catalog.save()
         await self._catalog.export_detections(
             jitter_location=self.octree.smallest_node_size()
@@ -725,6 +744,8 @@ class Search(BaseModel):
 
 class SearchTraces:
     _images: dict[float | None, WaveformImages]
+    _image_data: dict[int, tuple[list[np.ndarray], np.ndarray]]
+    _station_delays: dict[PhaseDescription, np.ndarray]
 
     def __init__(
         self,
@@ -739,6 +760,60 @@ class SearchTraces:
         self.end_time = end_time
 
         self._images = {}
+        self._image_data = {}
+        self._station_delays = {}
+
+    def _get_image_data(
+        self, image: WaveformImage
+    ) -> tuple[list[np.ndarray], np.ndarray]:
+        """Trace data and sample offsets of an image, cached across refinements.
+
+        Args:
+            image (WaveformImage): The image to get the data for.
+
+        Returns:
+            tuple[list[np.ndarray], np.ndarray]: Trace data and sample offsets.
+        """
+        image_data = self._image_data.get(id(image))
+        if image_data is None:
+            image_data = (
+                image.get_trace_data(dtype=np.float32),
+                image.get_offsets(self.start_time - self.parent._window_padding),
+            )
+            self._image_data[id(image)] = image_data
+        return image_data
+
+    async def _get_station_delays(
+        self,
+        image: WaveformImage,
+        nodes: Sequence[Node],
+    ) -> np.ndarray:
+        """Station delays of an image's phase for the given nodes.
+
+        Delays returned as a single row for several nodes are independent of
+        the nodes and are reused for all refinements of this block. A single
+        node always yields a single row, these delays are not cached.
+
+        Args:
+            image (WaveformImage): The image to get the delays for.
+            nodes (Sequence[Node]): The nodes to get the delays for.
+
+        Returns:
+            np.ndarray: The station delays, broadcastable to the travel times.
+        """
+        station_delays = self._station_delays.get(image.phase)
+        if station_delays is not None:
+            return station_delays
+
+        station_delays = await self.parent.station_corrections.get_delays(
+            image.stations.get_all_nsl(),
+            image.phase,
+            nodes,
+        )
+        station_delays = np.asarray(station_delays, dtype=np.float32)
+        if len(nodes) > 1 and station_delays.ndim == 2 and station_delays.shape[0] == 1:
+            self._station_delays[image.phase] = station_delays
+        return station_delays
 
     def _n_samples_semblance(self) -> int:
         """Number of samples to use for semblance calculation, includes padding."""
@@ -776,54 +851,35 @@ class SearchTraces:
         )
 
         if parent.station_corrections:
-            station_delays = await parent.station_corrections.get_delays(
-                image.stations.get_all_nsl(),
-                image.phase,
-                nodes,
-            )
-            traveltimes += station_delays
-
-        traveltimes_bad = np.isnan(traveltimes)
-        traveltimes[traveltimes_bad] = 0.0
-        # station_contribution = (~traveltimes_bad).sum(axis=1, dtype=np.float32)
-
-        shifts = np.round(-traveltimes / image.delta_t).astype(np.int32)
-        # weights = np.full_like(shifts, fill_value=image.weight, dtype=np.float32)
-        # Normalize by number of station contribution
-        # with np.errstate(divide="ignore", invalid="ignore"):
-        #     weights /= station_contribution[:, np.newaxis]
-
-        weights = np.full_like(shifts, fill_value=image.weight, dtype=np.float32)
-        weights[traveltimes_bad] = 0.0
+            traveltimes += await self._get_station_delays(image, nodes)
 
+        distance_weights = None
         if parent.distance_weights:
-            weights *= await parent.distance_weights.get_weights(
+            distance_weights = await parent.distance_weights.get_weights(
                 nodes,
                 image.stations,
             )
 
-        with np.errstate(divide="ignore", invalid="ignore"):
-            weights /= weights.sum(axis=1, keepdims=True)
-
-        # applying waterlevel
-        weights[weights < 1e-3] = 0.0
-
-        def expand_array(array: np.ndarray) -> np.ndarray:
-            """Fill arrays with zeros to pad the matrix."""
-            array_n_nodes = array.shape[0]
-            if array_n_nodes == octree.n_nodes:
-                return array
-
-            n_stations = image.stations.n_stations
-            filled = np.zeros((octree.n_nodes, n_stations), dtype=array.dtype)
-            filled[-array_n_nodes:] = array
-            return filled
+        # Staging runs off the event loop, so prefetch workers stay responsive
+        shifts, weights = await asyncio.to_thread(
+            array_tools.shifts_weights,
+            np.ascontiguousarray(traveltimes, dtype=np.float32),
+            delta_t=image.delta_t,
+            weight=image.weight,
+            distance_weights=distance_weights
+            if distance_weights is None
+            else np.ascontiguousarray(distance_weights, dtype=np.float32),
+            n_threads=parent.n_threads_parstack,
+        )
 
+        # New nodes are appended to the octree, stack only into their rows
+        trace_data, offsets = self._get_image_data(image)
         await semblance.add_semblance(
-            trace_data=image.get_trace_data(),
-            offsets=image.get_offsets(self.start_time - parent._window_padding),
-            shifts=expand_array(shifts),
-            weights=expand_array(weights),
+            trace_data=trace_data,
+            offsets=offsets,
+            shifts=shifts,
+            weights=weights,
+            n_nodes=octree.n_nodes,
             threads=self.parent.n_threads_parstack,
         )
 
@@ -843,8 +899,15 @@ class SearchTraces:
         if not isinstance(sampling_rate, float):
             raise TypeError("sampling rate has to be a float or int")
 
+        if all(
+            image.sampling_rate == sampling_rate
+            for image in self.images
+            if image.has_traces()
+        ):
+            return self.images
+
         logger.debug("downsampling images to %g Hz", sampling_rate)
-        self.images.resample(sampling_rate, max_normalize=True)
+        await asyncio.to_thread(self.images.resample, sampling_rate, max_normalize=True)
 
         return self.images
 
@@ -904,14 +967,13 @@ class SearchTraces:
         # Applying the generalized mean to the semblance
         # semblance.normalize(images.cumulative_weight())
 
-        leaf_node_mask = np.array([node.is_leaf() for node in octree.nodes], dtype=bool)
+        leaf_node_mask = octree.leaf_node_mask
         semblance.set_leaf_nodes(leaf_node_mask)
 
-        threshold = parent.detection_threshold ** (1.0 / parent.power_mean)
         detection_idx, detection_semblance = await semblance.find_peaks(
-            height=threshold,
-            prominence=threshold,
-            distance=round(parent.detection_blinding.total_seconds() * sampling_rate),
+            height=parent._peak_threshold,
+            prominence=parent._peak_threshold,
+            distance=parent._peak_distance_samples,
             nthreads=parent.n_threads_argmax,
         )
 
@@ -920,11 +982,22 @@ class SearchTraces:
 
         # Split Octree nodes above a semblance threshold. Once octree for all detections
         # in frame
-        maxima_node_indices = await semblance.maxima_node_idx()
-        refine_nodes: set[Node] = set()
-
-        for time_idx in detection_idx:
-            octree.map_semblance(semblance.get_semblance(time_idx))
+        maxima_node_indices = await semblance.maxima_node_idx(
+            nthreads=parent.n_threads_argmax
+        )
+        detection_semblances = semblance.get_semblances(detection_idx)
+
+        # Densest leaf node of every detection in one vectorized pass
+        leaf_node_indices = np.flatnonzero(leaf_node_mask)
+        leaf_node_volumes = octree.node_sizes[leaf_node_mask] ** 3
+        densest_node_indices = leaf_node_indices[
+            np.argmax(detection_semblances / leaf_node_volumes, axis=1)
+        ]
+
+        seed_node_indices: set[int] = set()
+        for time_idx, densest_node_idx in zip(
+            detection_idx, densest_node_indices, strict=True
+        ):
             node_idx = maxima_node_indices[time_idx]
             source_node = octree.nodes[node_idx]
 
@@ -937,14 +1010,19 @@ class SearchTraces:
                 border_width=parent.absorbing_boundary_width,
             ):
                 continue
-            refine_nodes.update(source_node)
-            refine_nodes.update(source_node.get_neighbours())
+            seed_node_indices.update((int(node_idx), int(densest_node_idx)))
 
-            densest_node = max(octree.leaf_nodes, key=lambda n: n.semblance_density())
-            refine_nodes.add(densest_node)
-            refine_nodes.update(densest_node.get_neighbours())
+        # Detections in a burst share nodes, expand each seed node only once
+        refine_mask = np.zeros(octree.n_nodes, dtype=bool)
+        for node_idx in seed_node_indices:
+            refine_mask[node_idx] = True
+            refine_mask |= octree.get_neighbours_mask(node_idx)
 
-        refine_nodes = {node for node in refine_nodes if node.can_split()}
+        refine_nodes = [
+            node
+            for node in octree.get_nodes(np.flatnonzero(refine_mask))
+            if node.can_split()
+        ]
 
         # refine_nodes is empty when all sources fall into smallest octree nodes
         new_nodes = []
@@ -969,14 +1047,16 @@ class SearchTraces:
             )
 
         detections = []
-        for time_idx, semblance_detection in zip(
-            detection_idx, detection_semblance, strict=True
+        phase_images = [
+            (image, parent.ray_tracers.get_phase_tracer(image.phase))
+            for image in await self.get_images(sampling_rate=None)
+        ]
+        for time_idx, semblance_detection, semblance_event in zip(
+            detection_idx, detection_semblance, detection_semblances, strict=True
         ):
             time = semblance.get_time_from_index(time_idx)
-            semblance_event = semblance.get_semblance(time_idx)
             node_idx = maxima_node_indices[time_idx]
 
-            octree.map_semblance(semblance_event)
             source_node = octree.nodes[node_idx]
             if parent.absorbing_boundary and source_node.is_inside_border(
                 with_surface=parent.absorbing_boundary == "with_surface",
@@ -984,6 +1064,8 @@ class SearchTraces:
             ):
                 continue
 
+            # Map only detections which are kept, one column of the gathered batch
+            octree.map_semblance(semblance_event)
             if parent.node_peak_interpolation:
                 source_location = await octree.interpolate_max_semblance(source_node)
             else:
@@ -998,30 +1080,17 @@ class SearchTraces:
             )
 
             # Attach modelled and picked arrivals to receivers
-            for image in await self.get_images(sampling_rate=None):
-                ray_tracer = parent.ray_tracers.get_phase_tracer(image.phase)
+            for image, ray_tracer in phase_images:
                 arrivals_model = ray_tracer.get_arrivals(
                     phase=image.phase,
                     event_time=time,
                     source=source_location,
                     receivers=image.stations,
                 )
-
                 arrival_times = [arr.time if arr else None for arr in arrivals_model]
-                station_delays = []
-
-                if parent.station_corrections:
-                    for nsl in image.stations.get_all_nsl():
-                        delay = parent.station_corrections.get_delay(
-                            nsl,
-                            image.phase,
-                            node=source_node,
-                        )
-                        station_delays.append(timedelta(seconds=delay))
-
                 arrivals_observed = image.search_phase_arrivals(
                     event_time=time,
-                    modelled_arrivals=[arr if arr else None for arr in arrival_times],
+                    modelled_arrivals=arrival_times,
                     threshold=parent.pick_confidence_threshold,
                 )
 
@@ -1043,13 +1112,13 @@ class SearchTraces:
                     stations=image.stations,
                     phase_arrivals=phase_detections,
                 )
-                detection.set_uncertainty(
-                    DetectionUncertainty.from_event(
-                        source_node=source_node,
-                        octree=octree,
-                    )
-                )
 
+            detection.set_uncertainty(
+                DetectionUncertainty.from_event(
+                    source_node=source_node,
+                    octree=octree,
+                )
+            )
             detections.append(detection)
 
         return detections, await semblance.get_trace()
@@ -4,6 +4,7 @@ import asyncio
 import logging
 import random
 import string
+from functools import lru_cache
 from typing import Any, Iterator, NoReturn
 from weakref import WeakValueDictionary
 
@@ -13,6 +14,7 @@ from rich.live import Live
 from rich.panel import Panel
 from rich.progress import Progress
 from rich.table import Table
+from rich.text import Text
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +24,7 @@ STATS_INSTANCES: WeakValueDictionary[str, Stats] = WeakValueDictionary()
 PROGRESS = Progress()
 
 
+@lru_cache
 def titelify(name: str) -> str:
     return " ".join(word for word in name.split("_")).capitalize()
 
@@ -29,30 +32,49 @@ def titelify(name: str) -> str:
 class RuntimeStats(BaseModel):
     @classmethod
     async def live_view(cls) -> NoReturn:
-        def generate_grid() -> Table:
-            """Make a new table."""
+        panel = Panel("", title="QSeek")
+        grid = Table.grid(expand=True)
+        grid.add_row(PROGRESS)
+        grid.add_row(panel)
+
+        stats_keys: set[str] = set()
+        value_cells: list[tuple[str, str, Text]] = []
+
+        def generate_table() -> None:
+            """Make a new table layout, only when the stats instances changed."""
             table = Table(show_header=False, box=None, expand=True)
-            stats_instaces = sorted(
-                STATS_INSTANCES.values(),
-                key=lambda s: s._position,
-            )
-            for stats in stats_instaces:
+            value_cells.clear()
+            for key, stats in sorted(
+                STATS_INSTANCES.items(), key=lambda item: item[1]._position
+            ):
                 table.add_row(
                     f"{stats.__class__.__name__.removesuffix('Stats')}", style="bold"
                 )
                 table.add_section()
-                stats._populate_table(table)
-            grid = Table.grid(expand=True)
-            grid.add_row(PROGRESS)
-            grid.add_row(Panel(table, title="QSeek"))
-            return grid
+                for name, title in stats._get_field_titles():
+                    cell = Text()
+                    table.add_row(title, cell, style="dim")
+                    value_cells.append((key, name, cell))
+            panel.renderable = table
+
+        def update_values() -> None:
+            """Update the value cells in place, on the event loop."""
+            for key, name, cell in value_cells:
+                stats = STATS_INSTANCES.get(key)
+                if stats is not None:
+                    cell.plain = str(getattr(stats, name))
 
         with Live(
+            grid,
             refresh_per_second=4,
             # screen=True,
-        ) as live:
+        ):
             while True:
-                live.update(generate_grid())
+                keys = set(STATS_INSTANCES.keys())
+                if keys != stats_keys:
+                    stats_keys = keys
+                    generate_table()
+                update_values()
                 try:
                     await asyncio.sleep(0.2)
                 except asyncio.CancelledError:
@@ -70,9 +92,16 @@ class Stats(BaseModel):
         uid = "".join(random.choices(string.ascii_uppercase + string.digits, k=16))
         STATS_INSTANCES[uid] = self
 
+    @classmethod
+    @lru_cache
+    def _get_field_titles(cls) -> tuple[tuple[str, str], ...]:
+        fields = {**cls.model_fields, **cls.model_computed_fields}
+        return tuple(
+            (name, field.title or titelify(name)) for name, field in fields.items()
+        )
+
     def _populate_table(self, table: Table) -> None:
-        for name, field in self.iter_fields():
-            title = field.title or titelify(name)
+        for name, title in self._get_field_titles():
             table.add_row(
                 title,
                 str(getattr(self, name)),
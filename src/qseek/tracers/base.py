@@ -77,7 +77,7 @@ class RayTracer(BaseModel):
             stations: Stations to calculate travel times to.
 
         Returns:
-            Travel times in seconds.
+            Travel times in seconds as float32 of shape (n-nodes, n-stations).
         """
         raise NotImplementedError
 
@@ -196,11 +196,16 @@ def surface_distances(nodes: Sequence[Node], stations: Stations) -> np.ndarray:
     Returns:
         np.ndarray: Distances in shape (n-nodes, n-stations).
     """
-    node_coords = get_node_coordinates(nodes, system="geographic")
+    return _surface_distances(
+        get_node_coordinates(nodes, system="geographic"), stations
+    )
+
+
+def _surface_distances(node_coords: np.ndarray, stations: Stations) -> np.ndarray:
     n_nodes = node_coords.shape[0]
 
     node_coords = np.repeat(node_coords, stations.n_stations, axis=0)
-    sta_coords = np.vstack(n_nodes * [stations.get_coordinates(system="geographic")])
+    sta_coords = np.tile(stations.get_coordinates(system="geographic"), (n_nodes, 1))
 
     return od.distance_accurate50m_numpy(
         node_coords[:, 0], node_coords[:, 1], sta_coords[:, 0], sta_coords[:, 1]
@@ -389,7 +394,7 @@ class TravelTimeTree(BaseModel):
         )
         self._cached_stations = stations
         self._cached_station_indices = {
-            sta.nsl.pretty: idx for idx, sta in enumerate(stations)
+            sta.nsl_pretty: idx for idx, sta in enumerate(stations)
         }
         await self.fill_lut(nodes)
 
@@ -401,15 +406,18 @@ class TravelTimeTree(BaseModel):
         logger.debug("filling traveltimes LUT for %d nodes", len(nodes))
         stations = self._cached_stations
 
+        node_coords = get_node_coordinates(nodes, system="geographic")
         traveltimes = await self._interpolate_travel_times(
-            surface_distances(nodes, stations),
+            _surface_distances(node_coords, stations),
             np.array([sta.effective_depth for sta in stations]),
-            np.array([node.as_location().effective_depth for node in nodes]),
+            -node_coords[:, 2],
         )
 
+        # Cast the batch once; rows are copied so LRU evictions free their memory
         node_lut = self._node_lut
+        traveltimes = traveltimes.astype(np.float32)
         for node, times in zip(nodes, traveltimes, strict=True):
-            times = times.astype(np.float32)
+            times = times.copy()
             times.setflags(write=False)
             node_lut[node.hash()] = times
 
@@ -420,7 +428,7 @@ class TravelTimeTree(BaseModel):
     ) -> np.ndarray:
         try:
             station_indices = np.fromiter(
-                (self._cached_station_indices[sta.nsl.pretty] for sta in stations),
+                (self._cached_station_indices[sta.nsl_pretty] for sta in stations),
                 dtype=int,
             )
         except KeyError as exc:
@@ -453,7 +461,7 @@ class TravelTimeTree(BaseModel):
             )
             return await self.get_travel_times(nodes, stations)
 
-        return np.asarray(stations_travel_times).astype(float, copy=False)
+        return np.asarray(stations_travel_times, dtype=np.float32)
 
     async def interpolate_travel_times(
         self,
@@ -3,6 +3,7 @@ from __future__ import annotations
 from datetime import datetime, timedelta
 from typing import TYPE_CHECKING, Literal, Sequence
 
+import numpy as np
 from pydantic import Field, PositiveFloat
 
 from qseek.octree import distances_stations
@@ -10,8 +11,6 @@ from qseek.tracers.base import ModelledArrival, RayTracer
 from qseek.utils import PhaseDescription
 
 if TYPE_CHECKING:
-    import numpy as np
-
     from qseek.models.location import Location
     from qseek.models.station import Stations
     from qseek.octree import Node
@@ -55,7 +54,7 @@ class ConstantVelocityTracer(RayTracer):
         self._check_phase(phase)
 
         distances = distances_stations(nodes, stations)
-        return distances / self.velocity
+        return (distances / self.velocity).astype(np.float32)
 
     def get_arrivals(
         self,
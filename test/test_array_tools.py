@@ -1,4 +1,5 @@
 import numpy as np
+import pytest
 
 from qseek.ext import array_tools
 
@@ -27,3 +28,63 @@ def test_argmax():
     idx, value = array_tools.argmax_masked(data, mask=mask)
 
     np.testing.assert_array_equal(np.max(data[mask], axis=0), value)
+
+
+def test_shifts_weights():
+    nnodes = 1000
+    nstations = 30
+    delta_t = 0.01
+    traveltimes = np.random.uniform(0.0, 10.0, size=(nnodes, nstations))
+    traveltimes = traveltimes.astype(np.float32)
+    traveltimes[np.random.uniform(size=traveltimes.shape) < 0.1] = np.nan
+    traveltimes[0] = np.nan
+    distance_weights = np.random.uniform(0.5, 1.0, size=(nnodes, nstations))
+    distance_weights = distance_weights.astype(np.float32)
+
+    shifts, weights = array_tools.shifts_weights(
+        traveltimes,
+        delta_t=delta_t,
+        weight=0.5,
+        distance_weights=distance_weights,
+    )
+
+    traveltimes_bad = np.isnan(traveltimes)
+    shifts_ref = np.rint(traveltimes * np.float32(-1.0 / delta_t))
+    shifts_ref[traveltimes_bad] = 0.0
+    np.testing.assert_array_equal(shifts, shifts_ref.astype(np.int32))
+
+    weights_ref = np.where(traveltimes_bad, 0.0, 0.5) * distance_weights
+    weights_sum = weights_ref.sum(axis=1, keepdims=True)
+    np.divide(weights_ref, weights_sum, out=weights_ref, where=weights_sum > 0.0)
+    weights_ref[weights_ref < 1e-3] = 0.0
+    np.testing.assert_allclose(weights, weights_ref, rtol=1e-5, atol=1e-6)
+    assert not weights[0].any()
+
+
+def test_nanminmax():
+    data = np.random.uniform(-10.0, 10.0, size=(1000, 300)).astype(np.float32)
+    data[np.random.uniform(size=data.shape) < 0.1] = np.nan
+
+    min_value, max_value = array_tools.nanminmax(data)
+    assert min_value == np.nanmin(data)
+    assert max_value == np.nanmax(data)
+
+    with pytest.raises(ValueError):
+        array_tools.nanminmax(np.full(10, np.nan, dtype=np.float32))
+
+
+def test_pairwise_distances():
+    coords_a = np.random.uniform(-1e4, 1e4, size=(500, 3))
+    coords_b = np.random.uniform(-1e4, 1e4, size=(40, 3))
+
+    distances = array_tools.pairwise_distances(coords_a, coords_b)
+    distances_ref = np.linalg.norm(coords_a[:, np.newaxis] - coords_b, axis=2)
+    assert distances.dtype == np.float32
+    np.testing.assert_allclose(distances, distances_ref, rtol=1e-6)
+
+    out = np.empty((500, 40), dtype=np.float32)
+    assert array_tools.pairwise_distances(coords_a, coords_b, out=out) is out
+    np.testing.assert_array_equal(out, distances)
+
+    with pytest.raises(ValueError):
+        array_tools.pairwise_distances(coords_a, coords_b, out=out[:10])
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from qseek.distance_weights import LUT_DTYPE, DistanceWeights
+
+KM = 1e3
+
+if TYPE_CHECKING:
+    from qseek.models.station import Stations
+    from qseek.octree import Octree
+
+
+def lut_size(n_rows: int, stations: Stations) -> int:
+    return n_rows * stations.n_stations * np.dtype(LUT_DTYPE).itemsize
+
+
+@pytest.mark.asyncio
+async def test_lut_cache_size(octree: Octree, stations: Stations) -> None:
+    octree = octree.copy(deep=True)
+    max_rows = 100
+    assert octree.n_nodes > max_rows
+
+    distance_weights = DistanceWeights(lut_cache_size=lut_size(max_rows, stations))
+    distance_weights.prepare(stations, octree)
+    assert distance_weights._node_lut.shape[0] <= max_rows
+    assert len(distance_weights._node_lut_rows) <= max_rows
+
+    weights_ref = distance_weights.calc_weights(
+        distance_weights.get_distances(octree.nodes)
+    )
+    weights = await distance_weights.get_weights(octree.nodes, stations)
+    np.testing.assert_allclose(weights, weights_ref, rtol=1e-3)
+
+    for node in octree.leaf_nodes[:10]:
+        node.split()
+    for nodes in (octree.leaf_nodes, octree.nodes[-50:], octree.nodes):
+        weights = await distance_weights.get_weights(nodes, stations)
+        weights_ref = distance_weights.calc_weights(
+            distance_weights.get_distances(nodes)
+        )
+        np.testing.assert_allclose(weights, weights_ref, rtol=1e-3)
+        assert distance_weights._node_lut.shape[0] <= max_rows
+        assert len(distance_weights._node_lut_rows) <= max_rows
+        assert distance_weights.lut_fill_level() <= 1.0
+
+
+@pytest.mark.asyncio
+async def test_lut_eviction(
+    octree: Octree, stations: Stations, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    octree = octree.copy(deep=True)
+    max_rows = 100
+    distance_weights = DistanceWeights(lut_cache_size=lut_size(max_rows, stations))
+    distance_weights.prepare(stations, octree)
+    assert distance_weights.lut_fill_level() == 1.0
+
+    node_rows = distance_weights._node_lut_rows
+    hot_nodes = octree.nodes[:50]
+    await distance_weights.get_weights(hot_nodes, stations)
+
+    cached_nodes = octree.nodes[max_rows - 20 : max_rows]
+    cached_rows = [node_rows[node.hash()] for node in cached_nodes]
+    missing_nodes = octree.nodes[max_rows : max_rows + 30]
+
+    n_computed = []
+    get_distances = DistanceWeights.get_distances
+
+    def count_distances(self, nodes, out=None):
+        n_computed.append(len(nodes))
+        return get_distances(self, nodes, out=out)
+
+    monkeypatch.setattr(DistanceWeights, "get_distances", count_distances)
+    nodes = cached_nodes + missing_nodes
+    weights = await distance_weights.get_weights(nodes, stations)
+    monkeypatch.undo()
+
+    # Only the missing nodes are computed, the requested rows are not evicted
+    assert n_computed == [len(missing_nodes)]
+    assert [node_rows[node.hash()] for node in cached_nodes] == cached_rows
+    assert all(node.hash() in node_rows for node in missing_nodes)
+    # The least recently used nodes were evicted, the hot nodes survive
+    assert all(node.hash() in node_rows for node in hot_nodes)
+    assert all(node.hash() not in node_rows for node in octree.nodes[50:80])
+    assert len(node_rows) == max_rows
+
+    weights_ref = distance_weights.calc_weights(distance_weights.get_distances(nodes))
+    np.testing.assert_allclose(weights, weights_ref, rtol=1e-3)
+
+
+def test_lut_disk_cache(
+    octree: Octree,
+    stations: Stations,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(DistanceWeights, "cache_dir", tmp_path)
+
+    distance_weights = DistanceWeights(
+        cache_lut=True, lut_cache_size=lut_size(octree.n_nodes // 2, stations)
+    )
+    distance_weights.prepare(stations, octree)
+    assert not list(tmp_path.iterdir())
+
+    distance_weights = DistanceWeights(cache_lut=True)
+    distance_weights.prepare(stations, octree)
+    cache_files = list(tmp_path.glob("*.npy"))
+    assert len(cache_files) == 1
+    assert np.load(cache_files[0]).shape == (octree.n_nodes, stations.n_stations)
+
+    distance_weights_cached = DistanceWeights(cache_lut=True)
+    distance_weights_cached.prepare(stations, octree)
+    np.testing.assert_array_equal(
+        distance_weights_cached._node_lut, distance_weights._node_lut
+    )
+
+    moved_octree = octree.copy(deep=True)
+    moved_octree.location = octree.location.model_copy(update={"elevation": 8 * KM})
+    distance_weights_moved = DistanceWeights(cache_lut=True)
+    distance_weights_moved.prepare(stations, moved_octree)
+    assert len(list(tmp_path.glob("*.npy"))) == 2
+    weights_ref = distance_weights_moved.calc_weights(
+        distance_weights_moved.get_distances(moved_octree.nodes)
+    )
+    np.testing.assert_allclose(distance_weights_moved._node_lut, weights_ref, rtol=1e-3)
+
+
+@pytest.mark.asyncio
+async def test_far_stations(octree: Octree, stations: Stations) -> None:
+    radius = 30.0
+    distance_weights = DistanceWeights(radius_meters=radius)
+    distance_weights.prepare(stations, octree)
+
+    distances = distance_weights.get_distances(octree.nodes)
+    assert distances.max() / radius > 300.0
+
+    weights = await distance_weights.get_weights(octree.nodes, stations)
+    weights_ref = distance_weights.calc_weights(distances)
+    assert np.all(weights > 0.0)
+    np.testing.assert_allclose(weights, weights_ref, rtol=1e-6)
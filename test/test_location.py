@@ -3,6 +3,7 @@ from __future__ import annotations
 import random
 
 import numpy as np
+from pyrocko import orthodrome as od
 
 from qseek.models import Location
 
@@ -16,6 +17,23 @@ def test_location() -> None:
     loc.surface_distance_to(loc_other)
 
 
+def test_distance_different_origin() -> None:
+    loc = Location(lat=11.0, lon=23.55, north_shift=2 * KM, elevation=1 * KM)
+    loc_other = Location(lat=13.123, lon=21.12, depth=5 * KM)
+
+    ecef = np.array(od.geodetic_to_ecef(*loc.effective_lat_lon, 1 * KM))
+    ecef_other = np.array(od.geodetic_to_ecef(*loc_other.effective_lat_lon, -5 * KM))
+    np.testing.assert_allclose(
+        loc.distance_to(loc_other), np.linalg.norm(ecef - ecef_other)
+    )
+    np.testing.assert_allclose(
+        loc.surface_distance_to(loc_other),
+        od.distance_accurate50m_numpy(
+            *loc.effective_lat_lon, *loc_other.effective_lat_lon
+        )[0],
+    )
+
+
 def test_distance_same_origin():
     loc = Location(lat=11.0, lon=23.55)
 
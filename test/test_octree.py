@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import numpy as np
+
 from qseek.octree import NodeSplitError, Octree
 
 km = 1e3
@@ -26,6 +28,20 @@ def test_octree(octree: Octree, plot: bool) -> None:
     for node in octree:
         node.semblance = node.depth + node.east + node.north
 
+    threshold = float(np.median(octree.semblance))
+    np.testing.assert_equal(
+        octree.get_coordinates_by_threshold(threshold, system="raw"),
+        [node.coordinates for node in octree.get_nodes_by_threshold(threshold)],
+    )
+
+    for node_idx in (0, 80, octree.n_nodes - 1):
+        neighbours = octree.get_nodes(
+            np.flatnonzero(octree.get_neighbours_mask(node_idx))
+        )
+        expected = octree[node_idx].get_neighbours()
+        assert len(neighbours) == len(expected)
+        assert all(a is b for a, b in zip(neighbours, expected, strict=True))
+
     if plot:
         import matplotlib.pyplot as plt
 
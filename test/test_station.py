@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import random
+
+import numpy as np
+
+from qseek.models.station import Station, Stations
+
+KM = 1e3
+
+
+def test_mean_interstation_distance() -> None:
+    stations = []
+    for i_sta in range(30):
+        lat, lon = random.choice([(10.0, 10.0), (10.0, 10.0), (10.1, 10.05)])
+        stations.append(
+            Station(
+                network="XX",
+                station=f"STA{i_sta:02d}",
+                lat=lat,
+                lon=lon,
+                elevation=random.uniform(0, 0.8) * KM,
+                depth=random.uniform(0, 0.2) * KM,
+                north_shift=random.uniform(-10, 10) * KM,
+                east_shift=random.uniform(-10, 10) * KM,
+            )
+        )
+    stations = Stations(stations=stations)
+
+    distances = [
+        sta_1.distance_to(sta_2)
+        for sta_1 in stations
+        for sta_2 in stations
+        if sta_1 is not sta_2
+    ]
+    np.testing.assert_allclose(
+        stations.mean_interstation_distance(), np.mean(distances), rtol=1e-9
+    )
+
+    same_origin = Stations(stations=[sta for sta in stations if sta.lat == 10.0])
+    distances = [
+        sta_1.distance_to(sta_2)
+        for sta_1 in same_origin
+        for sta_2 in same_origin
+        if sta_1 is not sta_2
+    ]
+    np.testing.assert_allclose(
+        same_origin.mean_interstation_distance(), np.mean(distances), rtol=1e-9
+    )
+
+
+def test_stations_equality() -> None:
+    def make_stations() -> Stations:
+        return Stations(
+            stations=[
+                Station(network="XX", station=f"STA{i_sta:02d}", lat=10.0, lon=10.0)
+                for i_sta in range(5)
+            ]
+        )
+
+    stations = make_stations()
+    stations_other = make_stations()
+    stations.get_coordinates()
+    stations_other.get_coordinates()
+    stations.get_indices(stations)
+    assert stations == stations_other
+
+    stations_other.blacklist_station(stations_other.stations[0], reason="test")
+    assert stations != stations_other